@@ -1,15 +1,21 @@
 import streamlit as st
-import json
 import ui_components as ui
 
 try:
     import utils.audit_logic as audit
-    import utils.pdf_generator as pdf_gen
+    import utils.report_cache as report_cache
     import utils.firebase_handler as fb
+    import utils.persistence_queue as persistence
+    import utils.metrics as metrics
 except ImportError as e:
     st.error(f"⚠️ Import Error: {e}")
     st.stop()
 
+# Select the DB backend once per process (no-op on reruns)
+fb.warm_up()
+# Prometheus /metrics on SREV_METRICS_PORT, one exporter thread per process (no-op on reruns)
+metrics.start_exporter()
+
 # Page Config
 st.set_page_config(
     page_title="SREV Evolution | Digital Health Audit",
@@ -23,6 +29,14 @@ ui.apply_styles()
 # Header
 ui.render_header()
 
+# Report sections in display order
+SECTION_TITLES = {
+    'structural_integrity': "1. Structural Integrity (SEO & Speed)",
+    'public_pulse': "2. Public Pulse (Reputation)",
+    'conversion_circulation': "3. Conversion Circulation (Leads)",
+    'meta_profile': "4. Meta Profile (Analytics)"
+}
+
 # State Management
 if 'audit_results' not in st.session_state:
     st.session_state.audit_results = None
@@ -50,6 +64,8 @@ if not st.session_state.audit_submitted:
             
             # Email separate or with others
             contact_email = st.text_input("Email Address", placeholder="doc@clinic.com")
+            force_fresh = st.checkbox("Force fresh scan (ignore recent cached results)")
+            deep_scan = st.checkbox("Deep scan (measure page weight, compression and caching of every asset)")
 
             st.write("")
             submit_button = st.form_submit_button("🏥 RUN DIGITAL BIOPSY", type="primary")
@@ -64,7 +80,9 @@ if not st.session_state.audit_submitted:
                         "url": website_url,
                         "gmb": gmb_link,
                         "fb": fb_link,
-                        "insta": insta_link
+                        "insta": insta_link,
+                        "fresh": force_fresh,
+                        "deep": deep_scan
                     }
                     st.rerun()
                 else:
@@ -80,8 +98,21 @@ if not st.session_state.audit_submitted:
             """)
 # Audit Execution & Report Display
 if st.session_state.audit_submitted and not st.session_state.audit_results:
-    # Run Animation
-    ui.render_scanning_animation()
+    # Live view: gauge and section cards fill in as each part of the audit finishes
+    st.markdown("## Diagnosis in Progress")
+    progress_bar = st.progress(0)
+    ui.render_scan_progress(progress_bar, 0)
+    gauge_slot = st.empty()
+    section_slots = {name: st.empty() for name in SECTION_TITLES}
+    live_sections = {}
+    
+    def show_section(name, section, progress):
+        live_sections[name] = section
+        ui.render_scan_progress(progress_bar, progress, name)
+        with gauge_slot.container():
+            ui.render_guage_chart(audit.partial_health_score(live_sections), title="Health Score (so far)", key=f"live_gauge_{len(live_sections)}")
+        with section_slots[name].container():
+            ui.render_section(SECTION_TITLES[name], section)
     
     # Perform Audit
     inputs = st.session_state.inputs
@@ -90,12 +121,17 @@ if st.session_state.audit_submitted and not st.session_state.audit_results:
         inputs['url'], 
         inputs['gmb'], 
         inputs['fb'], 
-        inputs['insta']
+        inputs['insta'],
+        force_fresh=inputs.get('fresh', False),
+        deep=inputs.get('deep', False),
+        on_section=show_section
     )
     
-    # Save to Backend
-    fb.save_patient_file(results.copy())
-    fb.trigger_admin_email(results)
+    # Stamp patient_id / created_at now so the saved record, the downloads and the report cache share them
+    fb.stamp_record(results)
+    
+    # Save to Backend (write-behind: batched in the background, off the user's path)
+    persistence.submit(results.copy())
     
     # Update State
     st.session_state.audit_results = results
@@ -113,6 +149,12 @@ if st.session_state.audit_results:
     ui.render_guage_chart(display_score)
     st.markdown("</div>", unsafe_allow_html=True)
     
+    cache_info = res.get('cache', {})
+    if cache_info.get('hit'):
+        st.caption(f"⚡ Served from a recent scan ({int(cache_info['age_seconds'] // 60)} min old). Tick 'Force fresh scan' for a new one.")
+    if res.get('timed_out'):
+        st.caption(f"⏱️ Some sources did not respond within the scan time budget: {', '.join(res['timed_out'])}. Their scores are partial.")
+    
     # Report Card
     if display_score > 80:
         st.success("Condition: STABLE. Minimal intervention required.")
@@ -123,10 +165,8 @@ if st.session_state.audit_results:
     
     # Detailed Sections
     biopsy = res['digital_biopsy']
-    ui.render_section("1. Structural Integrity (SEO & Speed)", biopsy['structural_integrity'])
-    ui.render_section("2. Public Pulse (Reputation)", biopsy['public_pulse'])
-    ui.render_section("3. Conversion Circulation (Leads)", biopsy['conversion_circulation'])
-    ui.render_section("4. Meta Profile (Analytics)", biopsy['meta_profile'])
+    for name, title in SECTION_TITLES.items():
+        ui.render_section(title, biopsy[name])
     
     # CTA & Download
     ui.render_cta()
@@ -134,24 +174,23 @@ if st.session_state.audit_results:
     # Download Logic
     st.markdown("---")
     
-    # Generate PDF
-    pdf_buffer = pdf_gen.generate_pdf_report(res)
+    # PDF + JSON rendered once per audit, then served from memory on every rerun
+    artifacts = report_cache.get_artifacts(res)
     
     col1, col2 = st.columns(2)
     with col1:
         st.download_button(
             label="📄 Download Medical Report (PDF)",
-            data=pdf_buffer,
+            data=artifacts.pdf,
             file_name=f"SREV_Biopsy_{res['hospital_info']['name'].replace(' ', '_')}.pdf",
             mime="application/pdf",
             type="primary"
         )
     
     with col2:
-        res_json = json.dumps(res, indent=4)
         st.download_button(
             label="📥 Download JSON Data",
-            data=res_json,
+            data=artifacts.json,
             file_name=f"audit_raw_{res['hospital_info']['name'].replace(' ', '_')}.json",
             mime="application/json"
         )
@@ -171,23 +210,32 @@ with st.sidebar:
         if password == "srev2025":
             st.success("Access Granted")
             st.subheader("Patient Database")
-            records = fb.get_all_records()
-            if records:
-                # Simplify for display
-                display_data = []
-                for r in records:
-                    info = r.get('hospital_info', {})
-                    display_data.append({
-                        "Date": r.get('created_at', '')[:10],
-                        "Hospital": info.get('name'),
-                        "Score": r.get('health_score')
-                    })
+            
+            # Indexed, paginated query: only one page of summary rows is loaded per rerun
+            search = st.text_input("Search Hospital (name starts with)")
+            sort_labels = {"Newest First": ("created_at", True), "Highest Score": ("health_score", True),
+                           "Lowest Score": ("health_score", False), "Hospital A-Z": ("name", False)}
+            sort_by, descending = sort_labels[st.selectbox("Sort By", list(sort_labels))]
+            page_size = 25
+            page = st.number_input("Page", min_value=1, value=1, step=1)
+            
+            rows, total = fb.query_records(
+                sort_by=sort_by, descending=descending,
+                offset=(page - 1) * page_size, limit=page_size,
+                name_prefix=search.strip() or None
+            )
+            if total:
+                display_data = [{
+                    "Date": r['created_at'][:10],
+                    "Hospital": r['name'],
+                    "Score": r['health_score']
+                } for r in rows]
                 
+                st.caption(f"{total} records | page {page} of {max(1, -(-total // page_size))}")
                 st.dataframe(display_data)
                 
-                # Download All Logic
-                full_json = json.dumps(records, indent=4)
-                st.download_button("📥 Export Full DB", full_json, "srev_master_db.json", "application/json")
+                # Download All Logic (built only when the button is clicked)
+                st.download_button("📥 Export Full DB", fb.export_all_json, "srev_master_db.json", "application/json")
             else:
                 st.info("No records found in Local DB.")
         elif password:
@@ -0,0 +1,175 @@
+"""
+AUDIT BENCHMARK.
+End-to-end perform_audit latency against the local fixture server (no network, no caches).
+
+    python -m benchmarks.bench_audit                                   # 1 and 8 concurrent audits
+    python -m benchmarks.bench_audit --audits 100 --concurrency 1,8,32 --latency 0.05 --error-rate 0.02
+    python -m benchmarks.bench_audit --save benchmarks/baseline.json   # record a baseline
+    python -m benchmarks.bench_audit --compare benchmarks/baseline.json
+
+The fixture server runs in a child process so RSS and thread counts are the audit side only.
+Concurrent audits run on threads, one perform_audit each, like concurrent Streamlit sessions.
+--compare exits 1 if p95 latency or throughput regressed by more than --tolerance.
+"""
+import os
+import sys
+
+# Measure the engine, not the caches or the politeness limits (read at import time)
+os.environ.setdefault('SREV_HTTP_CACHE', '0')
+os.environ.setdefault('SREV_RATE_DEFAULT', '100000/100000')
+os.environ.setdefault('SREV_UA_SOURCE', 'offline')
+# Every fixture "site" is 127.0.0.1; audits now share one process-wide client, so its per-host
+# cap would serialise the whole benchmark on one fake host
+os.environ.setdefault('SREV_ASYNC_PER_HOST', '64')
+
+import json
+import math
+import time
+import argparse
+import platform
+import threading
+import subprocess
+import concurrent.futures
+from utils import audit_logic as audit
+from benchmarks import fixture_server
+
+SITES = ('clinic_dental', 'clinic_multispecialty')
+
+def start_fixture_server(args):
+    command = [sys.executable, '-m', 'benchmarks.fixture_server', '--port', '0',
+               '--latency', str(args.latency), '--jitter', str(args.jitter),
+               '--error-rate', str(args.error_rate), '--pad-kb', str(args.pad_kb)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True,
+                               cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    line = process.stdout.readline()
+    if not line.startswith('Serving fixtures on '):
+        process.kill()
+        raise RuntimeError(f"Fixture server failed to start: {line!r}")
+    return process, line.strip().rsplit(' ', 1)[-1]
+
+def peak_rss_mb():
+    """Peak resident set size of this process, None where `resource` is unavailable (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == 'Darwin' else 1024), 1) # bytes on macOS, KB elsewhere
+
+class ThreadSampler:
+    """Samples threading.active_count() in the background; .peak excludes the sampler itself."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count() - 1)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile."""
+    if not sorted_values: return None
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+def one_audit(base_url, i, deadline):
+    url, gmb, fb, insta = fixture_server.audit_urls(base_url, SITES[i % len(SITES)])
+    started = time.perf_counter()
+    report = audit.perform_audit(f"Bench Clinic {i}", url, gmb, fb, insta, force_fresh=True, deadline=deadline)
+    return time.perf_counter() - started, report
+
+def run_scenario(base_url, audits, concurrency, deadline):
+    latencies, timed_out = [], 0
+    with ThreadSampler() as threads:
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for seconds, report in pool.map(lambda i: one_audit(base_url, i, deadline), range(audits)):
+                latencies.append(seconds)
+                timed_out += bool(report.get('timed_out'))
+        wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'audits': audits,
+        'concurrency': concurrency,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'throughput_per_s': round(audits / wall, 2),
+        'wall_s': round(wall, 2),
+        'timed_out_audits': timed_out,
+        'peak_threads': threads.peak,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+def compare(results, baseline, tolerance):
+    """Prints deltas against a baseline; returns True if any scenario regressed beyond tolerance."""
+    regressed = False
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            print(f"{name}: no baseline")
+            continue
+        p95_change = current['p95_ms'] / previous['p95_ms'] - 1 if previous['p95_ms'] else 0
+        tput_change = current['throughput_per_s'] / previous['throughput_per_s'] - 1 if previous['throughput_per_s'] else 0
+        bad = p95_change > tolerance or tput_change < -tolerance
+        regressed |= bad
+        print(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms ({p95_change:+.0%}), "
+              f"throughput {previous['throughput_per_s']} -> {current['throughput_per_s']}/s ({tput_change:+.0%})"
+              + ("  REGRESSION" if bad else ""))
+    return regressed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark perform_audit against the local fixture server.")
+    parser.add_argument('--audits', type=int, default=40, help="audits per scenario")
+    parser.add_argument('--concurrency', default='1,8', help="comma-separated concurrent audit counts")
+    parser.add_argument('--latency', type=float, default=0.02, help="injected server latency (s)")
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--pad-kb', type=int, default=0, help="grow every page to at least this size")
+    parser.add_argument('--deadline', type=float, default=0, help="per-audit deadline (0 = none)")
+    parser.add_argument('--save', help="write results as a JSON baseline")
+    parser.add_argument('--compare', help="baseline JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    server, base_url = start_fixture_server(args)
+    try:
+        one_audit(base_url, 0, args.deadline) # Warm-up: imports, pools, UA list
+        results = {
+            'config': {key: getattr(args, key) for key in ('audits', 'latency', 'jitter', 'error_rate', 'pad_kb', 'deadline')},
+            'python': platform.python_version(),
+            'scenarios': {}
+        }
+        print(f"{'scenario':<10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'audits/s':>10}{'threads':>9}{'RSS MB':>8}")
+        for concurrency in (int(c) for c in args.concurrency.split(',')):
+            stats = run_scenario(base_url, args.audits, concurrency, args.deadline)
+            results['scenarios'][f"c{concurrency}"] = stats
+            print(f"{'c' + str(concurrency):<10}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+                  f"{stats['throughput_per_s']:>10}{stats['peak_threads']:>9}{str(stats['peak_rss_mb']):>8}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance): return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+HTML PARSER MICRO-BENCHMARK.
+Parse time per page for every installed backend over a corpus of saved clinic pages.
+
+    python -m benchmarks.bench_parsers                      # bundled fixtures
+    python -m benchmarks.bench_parsers saved_pages/ --rounds 50
+
+The first column is html_features.FeatureExtractor, the single-pass scan every audit runs
+on each fetched page (fed in the same chunk size as the streaming fetchers). The bs4 backends
+build the tree used by fetch_real_html_timed and the legacy soup-based helpers. selectolax
+(if installed) is listed for reference only: it is not wired into the app.
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import statistics
+from utils import html_parser
+from utils import html_features
+from utils import page_reader
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def load_corpus(paths):
+    files = []
+    for path in paths or [FIXTURES_DIR]:
+        files += sorted(glob.glob(os.path.join(path, '*.html'))) if os.path.isdir(path) else [path]
+    corpus = {}
+    for path in files:
+        with open(path, 'rb') as f:
+            corpus[os.path.basename(path)] = f.read()
+    return corpus
+
+def backends():
+    """name -> parse(bytes) callable."""
+    found = {'html_features (audits)': lambda content: html_features.extract_features(content, page_reader.CHUNK_SIZE)}
+    found.update({f"bs4[{name}]": (lambda content, name=name: html_parser.make_soup(content, name)) for name in html_parser.available_parsers()})
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+        found['selectolax (reference)'] = lambda content: LexborHTMLParser(content)
+    except ImportError:
+        pass
+    return found
+
+def bench(parse, content, rounds):
+    parse(content) # Warm-up
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        parse(content)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parse time per page for each HTML backend.")
+    parser.add_argument('paths', nargs='*', help="HTML files or directories (default: benchmarks/fixtures)")
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    corpus = load_corpus(args.paths)
+    if not corpus:
+        print("No .html pages found.")
+        return 1
+    print(f"Audits scan pages with html_features; soup helpers use bs4[{html_parser.PARSER}]")
+    print(f"{'page':<32}{'KB':>7}  " + "  ".join(f"{name:>24}" for name in backends()))
+    totals = {name: 0.0 for name in backends()}
+    for page, content in corpus.items():
+        row = []
+        for name, parse in backends().items():
+            ms = bench(parse, content, args.rounds)
+            totals[name] += ms
+            row.append(f"{ms:>21.2f} ms")
+        print(f"{page[:31]:<32}{len(content) / 1024:>7.1f}  " + "  ".join(row))
+    print(f"{'mean per page':<39}  " + "  ".join(f"{total / len(corpus):>21.2f} ms" for total in totals.values()))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+PDF REPORT BENCHMARK.
+Reports per second of generate_pdf_report over audits built offline from the bundled fixtures.
+
+    python -m benchmarks.bench_reports
+    python -m benchmarks.bench_reports --reports 500 --rounds 5
+    python -m benchmarks.bench_reports --against f9d753d~1   # vs pdf_generator.py at that git revision
+
+With --against, the generator at that revision is loaded from git into the same process and the two
+are timed in alternating rounds over the same audits, so the speedup can be reproduced on any machine.
+The audit dicts come from the real analyzers run on benchmarks/fixtures (no network), so the
+PDFs have the same sections, metrics and symptom lists as production reports.
+"""
+import os
+import sys
+import time
+import types
+import argparse
+import statistics
+import subprocess
+from utils import audit_logic as audit
+from utils import html_features
+from utils import pdf_generator
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITES = ('clinic_dental', 'clinic_multispecialty')
+
+def _snapshot(name, url):
+    with open(os.path.join(FIXTURES_DIR, name + '.html'), 'rb') as f:
+        content = f.read()
+    return audit.PageSnapshot(url, content, 0.4, html_features.extract_features(content))
+
+def sample_audit(site):
+    """One complete audit dict, as perform_audit would return it for this fixture site."""
+    url = f"https://{site}.example"
+    links = {'insta': 'fixture_clinic', 'fb': 'https://facebook.com/fixture'}
+    page = _snapshot(site, url)
+    report = audit.compile_report(
+        site.replace('_', ' ').title(), url, 'https://maps.app.goo.gl/fixture', links,
+        audit.fetch_pagespeed_data(url, page), audit.analyze_seo(url, page),
+        audit.analyze_social(links, _snapshot('instagram_profile', url), _snapshot('facebook_page', url)),
+        audit.analyze_gmb('https://maps.app.goo.gl/fixture', _snapshot('google_maps_place', url)),
+        audit.analyze_conversion(url, page), audit.analyze_meta_profile(url, page))
+    report['patient_id'] = f"pat_bench_{site}"
+    return report
+
+def load_generator(rev):
+    """utils/pdf_generator.py as of git revision `rev`, as a standalone module."""
+    source = subprocess.run(['git', 'show', f'{rev}:utils/pdf_generator.py'], cwd=REPO_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType(f'pdf_generator@{rev}')
+    exec(compile(source, f'pdf_generator.py@{rev}', 'exec'), module.__dict__)
+    return module
+
+def run(audits, reports, generator=pdf_generator):
+    started = time.perf_counter()
+    size = 0
+    for i in range(reports):
+        size += len(generator.generate_pdf_report(audits[i % len(audits)]).getvalue())
+    elapsed = time.perf_counter() - started
+    return reports / elapsed, size / reports
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF report generation.")
+    parser.add_argument('--reports', type=int, default=200, help="reports per round")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--against', metavar='REV', help="also time utils/pdf_generator.py from this git revision")
+    args = parser.parse_args(argv)
+
+    audits = [sample_audit(site) for site in SITES]
+    generators = {'current': pdf_generator}
+    if args.against:
+        generators[args.against] = load_generator(args.against)
+    rates = {name: [] for name in generators}
+    for generator in generators.values():
+        run(audits, 5, generator) # Warm-up: font metrics, imports
+    for _ in range(args.rounds):
+        for name, generator in generators.items():
+            rate, avg_size = run(audits, args.reports, generator)
+            rates[name].append(rate)
+            print(f"{name:>12} {rate:8.1f} reports/s  ({1000 / rate:.2f} ms/report, {avg_size / 1024:.1f} KB)")
+    medians = {name: statistics.median(values) for name, values in rates.items()}
+    for name, median in medians.items():
+        print(f"{name:>12} median {median:.1f} reports/s over {args.rounds} x {args.reports}")
+    if args.against:
+        print(f"speedup vs {args.against}: {medians['current'] / medians[args.against]:.2f}x")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
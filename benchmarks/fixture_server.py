@@ -0,0 +1,170 @@
+"""
+LOCAL FIXTURE SERVER.
+Serves the recorded pages in benchmarks/fixtures over HTTP/1.1 keep-alive, with injectable
+latency, errors and page size, so audits can be benchmarked offline and reproducibly.
+
+    python -m benchmarks.fixture_server --port 8765 --latency 0.05 --error-rate 0.05
+
+Routes (anything after the first path segment is ignored):
+    /site/<fixture>      a clinic page, e.g. /site/clinic_dental
+    /instagram/<handle>  instagram_profile.html
+    /facebook/<page>     facebook_page.html
+    /maps/<place>        google_maps_place.html
+Per-request overrides: ?latency=0.2&status=503&pad_kb=512
+200 pages carry an ETag; a matching If-None-Match is answered 304 Not Modified.
+"""
+import os
+import sys
+import hashlib
+import time
+import random
+import argparse
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+SOCIAL_FIXTURES = {'instagram': 'instagram_profile', 'facebook': 'facebook_page', 'maps': 'google_maps_place'}
+_PAD_LINE = b"<p class='srev-pad'>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>\n"
+
+def load_pages(directory=FIXTURES_DIR):
+    pages = {}
+    for name in os.listdir(directory):
+        if name.endswith('.html'):
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages[name[:-5]] = f.read()
+    return pages
+
+def pad_page(body, pad_kb):
+    """Grows the page to at least pad_kb KB with filler paragraphs before </body>."""
+    missing = pad_kb * 1024 - len(body)
+    if missing <= 0: return body
+    filler = _PAD_LINE * (missing // len(_PAD_LINE) + 1)
+    cut = body.rfind(b'</body>')
+    if cut < 0: return body + filler
+    return body[:cut] + filler + body[cut:]
+
+def audit_urls(base_url, site='clinic_dental'):
+    """(website, gmb, fb, insta) URLs for one audit against a fixture server at base_url."""
+    return (f"{base_url}/site/{site}", f"{base_url}/maps/{site}", f"{base_url}/facebook/{site}", f"{base_url}/instagram/{site}")
+
+class FaultProfile:
+    """Latency / error / size injection shared by all handler threads (seeded for reproducibility)."""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, pad_kb=0, seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pad_kb = pad_kb
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self):
+        """Returns (delay_seconds, failed) for one request."""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            return delay, self._random.random() < self.error_rate
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, like the real sites
+    disable_nagle_algorithm = True  # headers and body are separate writes; avoid delayed-ACK stalls on reused connections
+
+    def log_message(self, *args):
+        pass
+
+    def _page(self, path):
+        parts = [part for part in path.split('/') if part]
+        if len(parts) < 2: return None
+        if parts[0] == 'site': return self.server.pages.get(parts[1])
+        return self.server.pages.get(SOCIAL_FIXTURES.get(parts[0], ''))
+
+    def _respond(self, send_body):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        profile = self.server.profile
+        delay, failed = profile.draw()
+        time.sleep(float(query.get('latency', delay)))
+        status = int(query.get('status', profile.error_status if failed else 200))
+        body = self._page(url.path)
+        if body is None: status = 404
+        if status != 200:
+            body = f"<html><body>Error {status}</body></html>".encode()
+        else:
+            body = pad_page(body, int(query.get('pad_kb', profile.pad_kb)))
+        etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"' if status == 200 else None
+        if etag and self.headers.get('If-None-Match') == etag:
+            status, body = 304, b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag: self.send_header('ETag', etag)
+        if status in (429, 503): self.send_header('Retry-After', '1')
+        self.end_headers()
+        if send_body: self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def do_HEAD(self):
+        self._respond(False)
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256   # default listen backlog (5) adds 1s SYN retries under concurrent load
+
+class FixtureServer:
+    """Threaded fixture server on 127.0.0.1; use as a context manager or start()/stop()."""
+
+    def __init__(self, port=0, profile=None, directory=FIXTURES_DIR):
+        self.httpd = _HTTPServer(('127.0.0.1', port), FixtureHandler)
+        self.httpd.pages = load_pages(directory)
+        self.httpd.profile = profile or FaultProfile()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def audit_urls(self, site='clinic_dental'):
+        return audit_urls(self.base_url, site)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve recorded clinic/social pages with injectable faults.")
+    parser.add_argument('--port', type=int, default=8765, help="0 = pick a free port")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds before each response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="extra random 0..jitter seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with --error-status")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--pad-kb', type=int, default=0, help="grow every page to at least this size")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    profile = FaultProfile(args.latency, args.jitter, args.error_rate, args.error_status, args.pad_kb, args.seed)
+    server = FixtureServer(args.port, profile)
+    print(f"Serving fixtures on {server.base_url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+import pytest
+from utils import firebase_handler as fb
+from utils import record_index
+
+@pytest.fixture
+def local_db(tmp_path, monkeypatch):
+    """Runs against an empty local JSON-Lines DB in a temp dir (no Firestore, no legacy file)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('FIREBASE_CREDENTIALS_PATH', raising=False)
+    monkeypatch.delenv('FIRESTORE_EMULATOR_HOST', raising=False)
+    fb.reset_backend()
+    record_index._indexes.clear()
+    yield tmp_path
+    fb.reset_backend()
+    record_index._indexes.clear()
@@ -0,0 +1,109 @@
+"""Minimal in-memory stand-in for the Firestore query and batched-write API used by firebase_handler."""
+import itertools
+
+def _get(data, path):
+    for part in path.split('.'):
+        if not isinstance(data, dict) or part not in data: return None
+        data = data[part]
+    return data
+
+_OPS = {'>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b, '==': lambda a, b: a == b}
+
+class FakeDoc:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+class _Count:
+    def __init__(self, value):
+        self.value = value
+
+class _CountQuery:
+    def __init__(self, query):
+        self._query = query
+
+    def get(self):
+        return [[_Count(len(self._query._matching()))]]
+
+class FakeQuery:
+    def __init__(self, docs, filters=(), order=None, offset=0, limit=None, after=None):
+        self._docs, self._filters, self._order = docs, list(filters), order
+        self._offset, self._limit, self._after = offset, limit, after
+
+    def _copy(self, **changes):
+        state = {'filters': self._filters, 'order': self._order, 'offset': self._offset, 'limit': self._limit, 'after': self._after}
+        state.update(changes)
+        return FakeQuery(self._docs, **state)
+
+    def select(self, fields):
+        return self
+
+    def where(self, filter):
+        return self._copy(filters=self._filters + [filter])
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._copy(order=(field, direction == 'DESCENDING'))
+
+    def offset(self, n):
+        return self._copy(offset=n)
+
+    def limit(self, n):
+        return self._copy(limit=n)
+
+    def start_after(self, doc):
+        return self._copy(after=doc.id)
+
+    def count(self):
+        return _CountQuery(self._copy(offset=0, limit=None))
+
+    def _matching(self):
+        docs = [doc for doc in self._docs
+                if all(_get(doc._data, f.field_path) is not None and _OPS[f.op_string](_get(doc._data, f.field_path), f.value)
+                       for f in self._filters)]
+        if self._order:
+            field, descending = self._order
+            # Like Firestore: documents missing the order field are left out, strings compare by code point
+            docs = sorted((doc for doc in docs if _get(doc._data, field) is not None),
+                          key=lambda doc: (_get(doc._data, field), doc.id), reverse=descending)
+        return docs
+
+    def stream(self):
+        docs = self._matching()
+        if self._after is not None:
+            docs = list(itertools.dropwhile(lambda doc: doc.id != self._after, docs))[1:]
+        docs = docs[self._offset:]
+        return iter(docs if self._limit is None else docs[:self._limit])
+
+class FakeCollection(FakeQuery):
+    def document(self, doc_id=None):
+        return doc_id or f"auto{len(self._docs):04d}"
+
+class FakeBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def set(self, doc_id, data):
+        self._writes.append((doc_id, dict(data)))
+
+    def commit(self):
+        """Applies the writes; raises afterwards while db.fail_after_commit > 0 (a commit that timed out late)."""
+        for doc_id, data in self._writes:
+            self._db.docs[:] = [doc for doc in self._db.docs if doc.id != doc_id] + [FakeDoc(doc_id, data)]
+        if self._db.fail_after_commit:
+            self._db.fail_after_commit -= 1
+            raise TimeoutError("commit deadline exceeded")
+
+class FakeFirestore:
+    def __init__(self, records=()):
+        self.docs = [FakeDoc(f"doc{i:04d}", record) for i, record in enumerate(records)]
+        self.fail_after_commit = 0
+
+    def collection(self, name):
+        return FakeCollection(self.docs)
+
+    def batch(self):
+        return FakeBatch(self)
@@ -0,0 +1,38 @@
+import pytest
+from utils import firebase_handler as fb
+from utils import local_store
+from tests.fake_firestore import FakeFirestore
+
+NAMES = ["Apollo Clinic", "apex dental", "APEX Care", "Bright Smile", "Aptus Hospital", "City Dental", "alpha eye"]
+SORTS = ['created_at', 'name', 'health_score']
+
+def _records():
+    return [{'patient_id': f"pat_{i}", 'created_at': f"2026-01-{i + 1:02d}T10:00:00",
+             'health_score': 40 + i * 7, 'hospital_info': {'name': name}} for i, name in enumerate(NAMES)]
+
+def _names(rows):
+    return sorted(row['name'] for row in rows)
+
+@pytest.mark.parametrize('sort_by', SORTS)
+@pytest.mark.parametrize('descending', [True, False])
+def test_firestore_name_search_is_case_insensitive_for_every_sort(sort_by, descending):
+    db = FakeFirestore(_records())
+    rows, total = fb.query_records(sort_by=sort_by, descending=descending, limit=50, db=db, name_prefix="ap")
+    assert _names(rows) == ["APEX Care", "Apollo Clinic", "Aptus Hospital", "apex dental"]
+    assert total == 4
+
+@pytest.mark.parametrize('sort_by', SORTS)
+def test_firestore_and_local_index_agree(local_db, sort_by):
+    local_store.append_many(_records())
+    db = FakeFirestore(_records())
+    for prefix in ("ap", "AP", "c", "zzz"):
+        remote = fb.query_records(sort_by=sort_by, limit=50, db=db, name_prefix=prefix)
+        local = fb.query_records(sort_by=sort_by, limit=50, name_prefix=prefix)
+        assert _names(remote[0]) == _names(local[0]) and remote[1] == local[1]
+
+def test_firestore_paging_with_client_side_filter():
+    db = FakeFirestore(_records())
+    first, total = fb.query_records(sort_by='name', descending=False, offset=0, limit=2, db=db, name_prefix="ap")
+    second, _ = fb.query_records(sort_by='name', descending=False, offset=2, limit=2, db=db, name_prefix="ap")
+    assert total == 4 and len(first) == len(second) == 2
+    assert not {row['patient_id'] for row in first} & {row['patient_id'] for row in second}
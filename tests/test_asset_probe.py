@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from benchmarks.fixture_server import FixtureServer
+from utils import asset_probe
+from utils import async_http
+from utils import audit_logic as audit
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as server:
+        yield server
+
+def _probe(page_url, subresources, max_assets):
+    async def probe():
+        fetcher = async_http.AsyncFetcher()
+        try:
+            return await asset_probe.probe_assets(page_url, subresources, fetcher, budget=5, max_assets=max_assets)
+        finally:
+            await fetcher.aclose()
+    return asyncio.run(probe())
+
+def test_discovered_counts_distinct_urls_within_the_limit(server):
+    subresources = [('script', '/site/clinic_dental?a=1'), ('script', '/site/clinic_dental?a=1#dup'),
+                    ('image', '/missing.png'), ('image', '/missing2.png'), ('stylesheet', '/site/clinic_dental?a=2'),
+                    ('image', 'data:image/png;base64,xx')]
+    report = _probe(f"{server.base_url}/site/clinic_dental", subresources, max_assets=3)
+    assert (report['discovered'], report['skipped']) == (3, 1)
+    assert (report['probed'], report['failed'], report['unprobed']) == (1, 2, 0)
+
+def test_mostly_failed_probe_flags_the_weight():
+    assets = {**asset_probe.empty_report(), 'discovered': 10, 'probed': 4, 'failed': 6, 'unknown_size': 2, 'bytes': 1024}
+    metrics, symptoms = {}, []
+    audit._score_assets(assets, 2048, metrics, symptoms)
+    assert metrics['assets_failed'] == 6 and metrics['assets_unknown_size'] == 2
+    assert metrics['page_weight_partial'] is True and metrics['page_weight_kb'] == 3.0
+    assert any(symptom.startswith("Page weight incomplete: only 2 of 10") for symptom in symptoms)
+
+def test_fully_sized_probe_is_not_partial():
+    assets = {**asset_probe.empty_report(), 'discovered': 2, 'probed': 2, 'bytes': 1024}
+    metrics, symptoms = {}, []
+    audit._score_assets(assets, 0, metrics, symptoms)
+    assert 'page_weight_partial' not in metrics and not symptoms
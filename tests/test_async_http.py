@@ -0,0 +1,12 @@
+import asyncio
+from utils import async_http
+
+def test_pool_limits_reach_the_transport():
+    async def limits():
+        fetcher = async_http.AsyncFetcher(max_connections=7)
+        try:
+            pool = fetcher.client._transport._pool
+            return pool._max_connections, pool._max_keepalive_connections
+        finally:
+            await fetcher.aclose()
+    assert asyncio.run(limits()) == (7, 7)
@@ -0,0 +1,23 @@
+import time
+import asyncio
+import pytest
+from benchmarks.fixture_server import FixtureServer
+from utils import audit_logic as audit
+from utils import http_cache
+from utils import result_cache
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as server:
+        yield server
+
+@pytest.mark.parametrize('deep', [False, True])
+def test_slow_social_source_times_out(server, monkeypatch, deep):
+    monkeypatch.setattr(http_cache, 'ENABLED', False)
+    url, gmb, fb, insta = server.audit_urls()
+    started = time.monotonic()
+    report = asyncio.run(audit.perform_audit_async(
+        "Slow Clinic", url, gmb, fb, insta + '?latency=3', cache=result_cache.ResultCache(persist_path=None),
+        deep=deep, deadline=0.5))
+    assert report['timed_out'] == ['social']
+    assert time.monotonic() - started < 2
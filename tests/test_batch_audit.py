@@ -0,0 +1,23 @@
+import json
+from utils import batch_audit
+
+def test_read_rows_coerces_non_string_values(tmp_path):
+    path = tmp_path / 'leads.jsonl'
+    lines = [
+        json.dumps({'Name': 42, 'url': 'clinic.example', 'gmb': None, 'fb': 0}),
+        '{"name": "Torn',
+        json.dumps(['not', 'an', 'object']),
+        '',
+        json.dumps({'name': ' Second ', 'url': ' second.example ', 'insta': 'second'}),
+    ]
+    path.write_text('\n'.join(lines), encoding='utf-8')
+    rows = list(batch_audit.read_rows(str(path)))
+    assert rows == [
+        {'name': '42', 'url': 'clinic.example', 'gmb': '', 'fb': '', 'insta': ''},
+        {'name': 'Second', 'url': 'second.example', 'gmb': '', 'fb': '', 'insta': 'second'},
+    ]
+
+def test_read_rows_csv_with_missing_cells(tmp_path):
+    path = tmp_path / 'leads.csv'
+    path.write_text('name,url,gmb\nClinic,clinic.example\n', encoding='utf-8')
+    assert list(batch_audit.read_rows(str(path))) == [{'name': 'Clinic', 'url': 'clinic.example', 'gmb': '', 'fb': '', 'insta': ''}]
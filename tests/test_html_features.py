@@ -0,0 +1,56 @@
+import os
+import codecs
+import pytest
+from benchmarks.bench_parsers import FIXTURES_DIR, load_corpus
+from utils import html_features
+from utils import page_reader
+
+CORPUS = load_corpus([FIXTURES_DIR])
+
+@pytest.mark.parametrize('page', sorted(CORPUS))
+def test_features_do_not_depend_on_chunking(page):
+    content = CORPUS[page]
+    whole = html_features.extract_features(content, len(content))
+    for chunk_size in (1, 7, 512, page_reader.CHUNK_SIZE):
+        assert html_features.extract_features(content, chunk_size) == whole
+
+def test_gmb_reader_stops_at_title_and_rating():
+    content = CORPUS['google_maps_place.html']
+    reader = page_reader.PageReader(required=page_reader.REQUIRED_SIGNALS['gmb'])
+    for i in range(0, len(content), 64):
+        if not reader.add(content[i:i + 64]): break
+    body, features = reader.finish()
+    assert reader.stopped_early and not reader.truncated
+    assert len(body) < len(content)
+    assert features['title'] and features['rating'] == html_features.extract_features(content)['rating']
+
+def test_reader_truncates_at_the_byte_cap():
+    content = CORPUS['clinic_dental.html']
+    reader = page_reader.PageReader(max_bytes=1000)
+    assert not reader.add(content)
+    body, _ = reader.finish()
+    assert reader.truncated and len(body) == 1000
+
+CP1252_PAGE = os.path.join(os.path.dirname(__file__), 'fixtures', 'clinic_cp1252.html')
+CP1252_TITLE = "Clínica Dental São José – Ortodoncia y Implantes"
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 512, 2048, page_reader.CHUNK_SIZE])
+def test_header_charset_decodes_across_chunks(chunk_size):
+    with open(CP1252_PAGE, 'rb') as f:
+        content = f.read()
+    reader = page_reader.PageReader(encoding=page_reader.charset('text/html; charset="Windows-1252"'))
+    for i in range(0, len(content), chunk_size):
+        reader.add(content[i:i + chunk_size])
+    _, features = reader.finish()
+    assert features['title'] == CP1252_TITLE
+    assert features['meta_description'].startswith("Atención odontológica en Málaga")
+    assert features['rating'] == '4.8' and features['keywords']['tel:']
+
+def test_undeclared_non_utf8_page_falls_back_to_cp1252():
+    with open(CP1252_PAGE, 'rb') as f:
+        content = f.read()
+    assert html_features.extract_features(content, 7)['title'] == CP1252_TITLE
+
+def test_byte_order_mark_beats_the_header_charset():
+    content = codecs.BOM_UTF8 + "<html><head><title>Clínica – Niño</title></head></html>".encode('utf-8')
+    assert html_features.extract_features(content, 1, encoding='iso-8859-1')['title'] == "Clínica – Niño"
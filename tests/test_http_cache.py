@@ -0,0 +1,50 @@
+import pytest
+from benchmarks.fixture_server import FixtureServer
+from utils import audit_logic as audit
+from utils import http_cache
+from utils import page_reader
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = http_cache.HttpCache(str(tmp_path / 'http'))
+    monkeypatch.setattr(http_cache, 'ENABLED', True)
+    monkeypatch.setattr(http_cache, '_cache', cache)
+    return cache
+
+@pytest.fixture(scope='module')
+def server():
+    with FixtureServer() as server:
+        yield server
+
+def test_website_page_is_revalidated(cache, server):
+    url = f"{server.base_url}/site/clinic_dental"
+    first = audit._fetch_response_timed(url)
+    second = audit._fetch_response_timed(url)
+    assert not first.revalidated and second.revalidated
+    assert second.content == first.content and not second.stopped_early
+
+def test_head_only_page_is_cached_as_partial(cache, server):
+    url = f"{server.base_url}/instagram/fixture_clinic"
+    required = page_reader.REQUIRED_SIGNALS['social']
+    first = audit.fetch_page_snapshot(url, required=required)
+    second = audit._fetch_response_timed(url, required=required)
+    assert second.revalidated and second.stopped_early
+    assert audit._snapshot_from_result(url, second).features == first.features
+    assert cache.stats['revalidated'] == 1
+
+def test_partial_entry_is_not_reused_for_a_full_page(cache, server):
+    url = f"{server.base_url}/facebook/fixture_clinic?pad_kb=64"   # larger than one read chunk
+    head = audit._fetch_response_timed(url, required=page_reader.REQUIRED_SIGNALS['social'])
+    full = audit._fetch_response_timed(url)
+    assert head.stopped_early
+    assert not full.revalidated and not full.stopped_early and len(full.content) > len(head.content)
+    assert audit._fetch_response_timed(url, required=page_reader.REQUIRED_SIGNALS['gmb']).revalidated
+
+def test_body_evicted_after_read_is_still_served(cache, monkeypatch):
+    url = "https://clinic.example/"
+    cache.handle_response(url, None, 200, {'ETag': '"v1"'}, b"<html>v1</html>", url)
+    entry = cache.request_headers(url, {})
+    def evicted(path, *args):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(http_cache.os, 'utime', evicted)
+    assert cache.handle_response(url, entry, 304, {}, b'', url) == (200, b"<html>v1</html>", url, True)
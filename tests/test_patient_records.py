@@ -0,0 +1,71 @@
+from utils import firebase_handler as fb
+from utils import local_store
+from utils import persistence_queue
+from utils import record_index
+from tests.fake_firestore import FakeFirestore
+
+def _audit(name, score=50):
+    return {'hospital_info': {'name': name}, 'health_score': score}
+
+def test_same_second_submissions_get_distinct_ids(local_db):
+    queue = persistence_queue.WriteBehindQueue(flush_interval=0.05)
+    records = [queue.submit(_audit(f"Clinic {i}"), notify=False) for i in range(3)]
+    assert queue.shutdown(5)
+    ids = [record['patient_id'] for record in records]
+    assert len(set(ids)) == 3
+    for i, patient_id in enumerate(ids):
+        assert fb.get_record(patient_id)['hospital_info']['name'] == f"Clinic {i}"
+
+def test_stamp_keeps_existing_id():
+    record = fb.stamp_record({'patient_id': 'pat_1_abc'})
+    assert record['patient_id'] == 'pat_1_abc' and record['created_at']
+
+def test_index_never_repoints_a_duplicate_id(local_db):
+    local_store.append_many([{**_audit("First"), 'patient_id': 'pat_1'}, {**_audit("Second"), 'patient_id': 'pat_1'}])
+    index = record_index.RecordIndex()
+    assert index.get_record('pat_1')['hospital_info']['name'] == "First"
+    assert index.duplicate_ids == ['pat_1']
+    assert index.count() == 2
+
+def test_write_behind_retries_a_failed_batch(local_db, monkeypatch):
+    save = fb.save_patient_files
+    calls = []
+    def flaky(records):
+        calls.append(len(records))
+        return (False, "unavailable") if len(calls) == 1 else save(records)
+    monkeypatch.setattr(fb, 'save_patient_files', flaky)
+    queue = persistence_queue.WriteBehindQueue(flush_interval=0.05, backoff=0.01)
+    record = queue.submit(_audit("Retried"), notify=False)
+    assert queue.shutdown(5)
+    assert queue.stats['retries'] == 1 and queue.stats['saved'] == 1 and queue.stats['failed'] == 0
+    assert fb.get_record(record['patient_id'])['hospital_info']['name'] == "Retried"
+
+def test_retry_after_an_ambiguous_commit_does_not_duplicate(local_db, monkeypatch):
+    db = FakeFirestore()
+    db.fail_after_commit = 1 # First commit lands, then raises like a timeout
+    monkeypatch.setattr(fb, 'initialize_firebase', lambda: db)
+    queue = persistence_queue.WriteBehindQueue(flush_interval=0.05, backoff=0.01)
+    records = [queue.submit(_audit(f"Clinic {i}"), notify=False) for i in range(3)]
+    assert queue.shutdown(5)
+    assert queue.stats['retries'] == 1 and queue.stats['saved'] == 3
+    assert sorted(doc.id for doc in db.docs) == sorted(record['patient_id'] for record in records)
+
+def test_worker_survives_a_failing_batch(local_db, monkeypatch):
+    def broken_email(record):
+        raise RuntimeError("SMTP down")
+    monkeypatch.setattr(fb, 'trigger_admin_email', broken_email)
+    queue = persistence_queue.WriteBehindQueue(flush_interval=0.05, backoff=0.01)
+    write_batch, failures = queue._write_batch, [ZeroDivisionError()]
+    def flaky_write(batch):
+        if failures: raise failures.pop()
+        write_batch(batch)
+    monkeypatch.setattr(queue, '_write_batch', flaky_write)
+    queue.submit(_audit("Lost"))
+    assert queue.flush(5)
+    worker = queue._thread
+    records = [queue.submit(_audit(f"Clinic {i}")) for i in range(2)]
+    assert queue.flush(5)
+    assert queue._thread is worker and worker.is_alive() # Same thread: it never died
+    assert queue.stats['saved'] == 2
+    assert all(fb.get_record(record['patient_id']) for record in records)
+    assert queue.shutdown(5)
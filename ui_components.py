@@ -1,6 +1,4 @@
 import streamlit as st
-import time
-import random
 import plotly.graph_objects as go
 
 def apply_styles():
@@ -24,30 +22,20 @@ def render_header():
         st.markdown("<p style='color: #4A5568; margin-top: -10px;'>Advanced Diagnostic System for Medical Practices</p>", unsafe_allow_html=True)
     st.markdown("---")
 
-def render_scanning_animation():
-    """Plays the scanning animation."""
-    placeholder = st.empty()
-    bar = st.progress(0)
-    
-    steps = [
-        "Initializing Sterile Environment...",
-        "Scanning SEO Vital Signs...",
-        "Measuring Social Engagement Pulse...",
-        "Analyzing Reputation Reflexes...",
-        "Checking Website Response Time...",
-        "Synthesizing Diagnostic Report..."
-    ]
-    
-    for i, step in enumerate(steps):
-        placeholder.markdown(f"<div class='scanning-text'>🩺 {step}</div>", unsafe_allow_html=True)
-        progress = int((i + 1) / len(steps) * 100)
-        bar.progress(progress)
-        time.sleep(random.uniform(0.6, 1.2))
-        
-    placeholder.empty()
-    bar.empty()
+# Status line shown as each report section comes back from the live audit
+SCAN_MESSAGES = {
+    'structural_integrity': "SEO Vital Signs & Website Response Time measured...",
+    'public_pulse': "Social Engagement Pulse & Reputation Reflexes measured...",
+    'conversion_circulation': "Conversion Circulation checked...",
+    'meta_profile': "Analytics Profile checked..."
+}
+
+def render_scan_progress(bar, progress, section=None):
+    """Moves the scan progress bar to the real completion fraction (0-1) of the audit."""
+    text = SCAN_MESSAGES.get(section, "Initializing Sterile Environment...")
+    bar.progress(min(100, int(progress * 100)), text=f"🩺 {text}")
 
-def render_guage_chart(score, title="Overall Health Score"):
+def render_guage_chart(score, title="Overall Health Score", key=None):
     """Renders a Gauge Chart using Plotly."""
     
     # Determine Color
@@ -80,7 +68,7 @@ def render_guage_chart(score, title="Overall Health Score"):
     ))
     
     fig.update_layout(paper_bgcolor = "rgba(0,0,0,0)", font = {'color': "#2D3748", 'family': "Inter"})
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(fig, use_container_width=True, key=key)
 
 def render_section(title, data):
     """Renders a specific section of the report."""
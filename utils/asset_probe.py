@@ -0,0 +1,86 @@
+import os
+import asyncio
+from urllib.parse import urljoin, urlsplit
+from utils import user_agents
+from utils import rate_limiter
+
+# Deep-mode policy: HEAD-probe the page's scripts, images and stylesheets
+BUDGET = float(os.getenv('SREV_DEEP_BUDGET', '6'))            # seconds for the whole probe, hard stop
+CONCURRENCY = int(os.getenv('SREV_DEEP_CONCURRENCY', '16'))   # HEAD requests in flight (per-host limit still applies)
+MAX_ASSETS = int(os.getenv('SREV_DEEP_MAX_ASSETS', '150'))
+COMPRESSIBLE_KINDS = ('script', 'stylesheet')
+
+def resolve_assets(page_url, subresources, limit=MAX_ASSETS):
+    """Absolute, de-duplicated http(s) URLs of the page's subresources (first `limit`, None = all)."""
+    seen, assets = set(), []
+    for kind, raw in subresources:
+        url = urljoin(page_url, raw).split('#')[0]
+        if urlsplit(url).scheme not in ('http', 'https') or url in seen: continue
+        seen.add(url)
+        assets.append((kind, url))
+        if limit is not None and len(assets) >= limit: break
+    return assets
+
+def is_cacheable(headers):
+    """True if the asset carries a usable freshness lifetime (max-age / immutable / Expires)."""
+    cache_control = (headers.get('Cache-Control') or '').lower()
+    if any(directive in cache_control for directive in ('no-store', 'no-cache', 'max-age=0')): return False
+    return 'max-age' in cache_control or 'immutable' in cache_control or bool(headers.get('Expires'))
+
+def empty_report():
+    return {
+        'discovered': 0,      # distinct http(s) subresource URLs selected for probing (at most MAX_ASSETS)
+        'skipped': 0,         # further distinct URLs beyond MAX_ASSETS, never probed
+        'probed': 0,          # answered the HEAD with a non-error status
+        'failed': 0,          # error status (e.g. 404 / 405 to HEAD) or no answer
+        'unprobed': 0,        # still pending when the budget ran out
+        'bytes': 0,           # sum of Content-Length over probed assets
+        'unknown_size': 0,    # probed assets without a Content-Length
+        'uncompressed': [],   # scripts / stylesheets served without Content-Encoding
+        'uncached': []        # assets without caching headers
+    }
+
+async def _head(fetcher, url, pool):
+    limiter = rate_limiter.get_limiter()
+    async with pool: # Only requests about to be sent take a rate-limit token
+        await limiter.acquire_async(url)
+        async with fetcher.host_slot(url):
+            response = await fetcher.client.head(url, headers=user_agents.get_headers())
+    limiter.record_status(url, response.status_code, response.headers.get('Retry-After'))
+    return response
+
+async def probe_assets(page_url, subresources, fetcher, budget=BUDGET, concurrency=CONCURRENCY, max_assets=MAX_ASSETS):
+    """
+    HEAD-probes the page's subresources concurrently through the AsyncFetcher's pooled client
+    (at most `concurrency` in flight, per-host semaphores respected). Whatever has not
+    answered after `budget` seconds is cancelled and counted as unprobed. The batch politeness
+    delay is not applied here: the probe is already bounded by its own budget.
+    """
+    report = empty_report()
+    assets = resolve_assets(page_url, subresources, None)
+    report['skipped'] = max(0, len(assets) - max_assets)
+    assets = assets[:max_assets]
+    report['discovered'] = len(assets)
+    if not assets: return report
+
+    pool = asyncio.Semaphore(concurrency)
+    tasks = {asyncio.ensure_future(_head(fetcher, url, pool)): (kind, url) for kind, url in assets}
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+    for task in pending: task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+    report['unprobed'] = len(pending)
+
+    for task in done:
+        kind, url = tasks[task]
+        response = None if task.exception() else task.result()
+        if response is None or response.status_code >= 400:
+            report['failed'] += 1
+            continue
+        report['probed'] += 1
+        headers = response.headers
+        size = headers.get('Content-Length')
+        if size and size.isdigit(): report['bytes'] += int(size)
+        else: report['unknown_size'] += 1
+        if kind in COMPRESSIBLE_KINDS and not headers.get('Content-Encoding'): report['uncompressed'].append(url)
+        if not is_cacheable(headers): report['uncached'].append(url)
+    return report
@@ -0,0 +1,147 @@
+import os
+import time
+import asyncio
+from collections import namedtuple
+from urllib.parse import urlsplit
+import httpx
+from utils import user_agents
+from utils import http_cache
+from utils import page_reader
+from utils import html_features
+from utils import timing
+from utils import rate_limiter
+from utils import tracing
+from utils import metrics
+
+# Concurrency policy for the async engine
+PER_HOST_LIMIT = int(os.getenv('SREV_ASYNC_PER_HOST', '4'))       # in-flight requests per host
+MAX_CONNECTIONS = int(os.getenv('SREV_ASYNC_MAX_CONNECTIONS', '100'))
+POLITENESS_DELAY = float(os.getenv('SREV_ASYNC_HOST_DELAY', '0'))   # min seconds between requests to one host
+TIMEOUT = 5
+
+_log = tracing.get_logger('http')
+
+# status is None when every attempt failed (DNS, timeout, refused ...).
+# revalidated = body reused from the HTTP cache after a 304 Not Modified.
+# features = extracted while streaming (None -> scan `content` later); truncated = byte cap hit;
+# stopped_early = every required signal was found before the end of the page.
+# timings = timing.PHASES breakdown of the attempt that produced the result (None if none did).
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'content', 'duration', 'revalidated', 'features', 'bytes_read', 'truncated', 'stopped_early', 'timings'],
+                         defaults=(False, None, 0, False, False, None))
+
+def resolve_response(url, cache, entry, status, headers, final_url, reader, duration, timings=None):
+    """Shared tail of the sync and async fetchers. Returns a FetchResult, or None to retry."""
+    tracing.count(f"http.status.{status}")
+    tracing.annotate(url=url, http_status=status)
+    if status == 200 and reader is None:
+        _log.info("Skipping %s: not an HTML page (%s)", url, headers.get('Content-Type'))
+        return FetchResult(final_url, page_reader.UNSUPPORTED_MEDIA_TYPE, b'', duration, timings=timings)
+    content, features = reader.finish() if reader else (b'', None)
+    revalidated = False
+    if cache:
+        complete = reader is None or reader.complete
+        signals = reader.required if reader is not None and reader.stopped_early else None
+        status, content, final_url, revalidated = cache.handle_response(url, entry, status, headers, content, final_url, complete, signals)
+    metrics.HTTP_RESPONSES.inc(status=status, revalidated=str(revalidated).lower())
+    if status == 200:
+        tracing.annotate(bytes_read=reader.bytes_read if reader else len(content), revalidated=revalidated, truncated=bool(reader and reader.truncated))
+        if revalidated: tracing.count('http.revalidated')
+        elif reader.truncated: tracing.count('http.truncated')
+        if revalidated:
+            features = html_features.extract_features(content, encoding=entry.get('charset'))
+            return FetchResult(final_url, 200, content, duration, True, features, len(content), stopped_early=bool(entry.get('partial')), timings=timings)
+        if reader.truncated: _log.info("Truncated %s at %d bytes", url, reader.bytes_read)
+        return FetchResult(final_url, 200, content, duration, False, features, reader.bytes_read, reader.truncated, reader.stopped_early, timings)
+    elif status == 404:
+        return FetchResult(final_url, 404, b'', duration, timings=timings) # Page definitely doesn't exist
+    return None
+
+class AsyncFetcher:
+    """
+    Async HTTP transport for the audit engine.
+    One httpx.AsyncClient (pooled keep-alive connections) per event loop, plus a
+    semaphore per host so no single site gets more than PER_HOST_LIMIT parallel requests.
+    With politeness_delay > 0, requests to the same host are also spaced at least that far apart.
+    """
+
+    def __init__(self, per_host_limit=PER_HOST_LIMIT, max_connections=MAX_CONNECTIONS, timeout=TIMEOUT, politeness_delay=POLITENESS_DELAY):
+        self.per_host_limit = per_host_limit
+        self.politeness_delay = politeness_delay
+        self.client = httpx.AsyncClient(
+            verify=False,
+            follow_redirects=True,
+            timeout=timeout,
+            # Pool limits go on the transport: httpx ignores the client's limits= when a transport is given
+            transport=httpx.AsyncHTTPTransport(
+                retries=2, verify=False,  # connect-level retries
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections))
+        )
+        self._host_slots = {}
+        self._host_next_at = {}
+        self._stats = {'requests': 0, 'connections_opened': 0}
+
+    def host_slot(self, url):
+        host = urlsplit(url).hostname or ''
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slot
+
+    async def polite_wait(self, url):
+        """Reserves the next free send time for this host and sleeps until it."""
+        if not self.politeness_delay: return
+        host = urlsplit(url).hostname or ''
+        now = asyncio.get_running_loop().time()
+        ready_at = max(now, self._host_next_at.get(host, 0))
+        self._host_next_at[host] = ready_at + self.politeness_delay
+        if ready_at > now: await asyncio.sleep(ready_at - now)
+
+    @tracing.traced('http.fetch')
+    async def fetch(self, url, retries=1, required=(), max_bytes=page_reader.MAX_PAGE_BYTES):
+        """
+        Streamed GET with the same retry/404 semantics as the sync fetcher. Returns a FetchResult.
+        Reading stops at max_bytes or once every `required` feature has been seen.
+        """
+        cache = http_cache.get_cache()
+        limiter = rate_limiter.get_limiter()
+        start_time = time.monotonic()
+        for i in range(retries + 1):
+            try:
+                if i > 0: await asyncio.sleep(0.5)
+                headers = user_agents.get_headers()
+                entry = cache.request_headers(url, headers, required) if cache else None
+                reader, probe = None, timing.RequestTiming()
+                await limiter.acquire_async(url) # Shared per-host token bucket, before taking a connection slot
+                async with self.host_slot(url):
+                    await self.polite_wait(url)
+                    async with self.client.stream('GET', url, headers=headers, extensions={'trace': probe.trace}) as response:
+                        limiter.record_status(url, response.status_code, response.headers.get('Retry-After'))
+                        content_type = response.headers.get('Content-Type')
+                        if response.status_code == 200 and page_reader.is_html(content_type):
+                            reader = page_reader.PageReader(max_bytes, required, page_reader.charset(content_type))
+                            async for chunk in response.aiter_bytes(page_reader.CHUNK_SIZE):
+                                if not reader.add(chunk): break
+                        probe.stop('transfer')
+                self._stats['requests'] += 1
+                if probe.phases['connect'] is not None: self._stats['connections_opened'] += 1
+                duration = time.monotonic() - start_time
+                result = resolve_response(url, cache, entry, response.status_code, response.headers, str(response.url), reader, duration, probe.as_dict())
+                if result: return result
+            except Exception as e:
+                tracing.count('http.errors')
+                _log.warning("Attempt %d failed for %s: %r", i + 1, url, e)
+        return FetchResult(url, None, b'', time.monotonic() - start_time)
+
+    def stats(self):
+        """Pool reuse: a request that had to open a TCP connection is a miss, any other a hit."""
+        requests, opened = self._stats['requests'], self._stats['connections_opened']
+        return {'requests': requests, 'pool_hits': requests - opened, 'pool_misses': opened}
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
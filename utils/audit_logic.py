@@ -1,111 +1,251 @@
-import requests
-from bs4 import BeautifulSoup
+import os
 import random
 import time
 import re
-from fake_useragent import UserAgent
 from datetime import datetime
 import urllib3
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
+import asyncio
+import functools
+import threading
+import queue
+import contextvars
 import concurrent.futures
+from urllib.parse import urlsplit
+from utils import http_session
+from utils import user_agents
+from utils import async_http
+from utils import result_cache
+from utils import http_cache
+from utils import html_parser
+from utils import html_features
+from utils import page_reader
+from utils import timing
+from utils import asset_probe
+from utils import rate_limiter
+from utils import tracing
+from utils import metrics as srev_metrics
 
 # Suppress InsecureRequestWarning if using verify=False (common in scraping)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
+_log = tracing.get_logger('audit')
+
 def get_session():
-    """Creates a session with retry logic to improve stability."""
-    session = requests.Session()
-    # Reduced retries for SPEED, but keep backoff for stability
-    retry = Retry(connect=2, read=2, redirect=2, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504, 429])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+    """Returns the pooled session (shared per-host connection pools, retry with backoff)."""
+    return http_session.get_session()
 
 def get_random_header():
-    """Generates a random User-Agent header."""
-    try:
-        ua = UserAgent()
-        return {
-            'User-Agent': ua.random, 
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Referer': 'https://www.google.com/'
-        }
-    except:
-        return {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+    """Next User-Agent header profile from the preloaded rotation (no per-request UA generation)."""
+    return user_agents.get_headers()
 
-def fetch_real_html_timed(url, retries=1):
-    """Fetches real HTML and returns (soup, duration_seconds)."""
-    if not url: return None, 0
+class PageSnapshot:
+    """
+    One fetched page, shared read-only by every analyzer of that page.
+    `features` comes from the single-pass extractor (None if the fetch failed).
+    `truncated` means the body was cut at the download cap.
+    `timings` is the timing.PHASES breakdown of the successful attempt.
+    `timed_out` means the fetch was abandoned at the audit deadline.
+    """
+    __slots__ = ('url', 'content', 'duration', 'features', 'truncated', 'timings', 'timed_out')
+
+    def __init__(self, url, content=b'', duration=0, features=None, truncated=False, timings=None, timed_out=False):
+        self.url = url
+        self.content = content
+        self.duration = duration
+        self.features = features
+        self.truncated = truncated
+        self.timings = timings or dict.fromkeys(timing.PHASES)
+        self.timed_out = timed_out
+
+    @property
+    def ok(self):
+        return self.features is not None
+
+def _meta_description(features):
+    """Same precedence as before: <meta name=description>, else og:description."""
+    if features['meta_description'] is not None: return features['meta_description']
+    return features['og_description']
+
+def _normalize_url(url):
     if not url.startswith('http'): url = 'https://' + url
+    return url
+
+@tracing.traced('http.fetch')
+def _fetch_response_timed(url, retries=1, required=(), max_bytes=page_reader.MAX_PAGE_BYTES):
+    """
+    Fetches a URL and returns a FetchResult (status None = unreachable). Revalidates against the HTTP cache.
+    The body is streamed: reading stops at max_bytes, or once every `required` feature has been seen.
+    """
+    if not url: return async_http.FetchResult(url, None, b'', 0)
+    url = _normalize_url(url)
     
     session = get_session()
-    start_time = time.time()
+    cache = http_cache.get_cache()
+    limiter = rate_limiter.get_limiter()
+    start_time = time.monotonic()
+    parts = urlsplit(url)
     
     for i in range(retries + 1):
         try:
             # Minimal sleep for speed
             if i > 0: time.sleep(0.5) 
-            response = session.get(url, headers=get_random_header(), timeout=5, verify=False)
-            duration = time.time() - start_time
-            if response.status_code == 200:
-                return BeautifulSoup(response.content, 'html.parser'), duration
-            elif response.status_code == 404:
-                return None, duration # Page definitely doesn't exist
+            headers = get_random_header()
+            entry = cache.request_headers(url, headers, required) if cache else None
+            reader, probe = None, timing.RequestTiming()
+            limiter.acquire(url) # Shared per-host token bucket (429 back-off included)
+            probe.probe_dns(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+            with session.get(url, headers=headers, timeout=5, verify=False, stream=True) as response:
+                limiter.record_status(url, response.status_code, response.headers.get('Retry-After'))
+                # requests can't split connect/TLS out: elapsed = send -> headers parsed (includes them on a cold pool)
+                probe.phases['ttfb'] = response.elapsed.total_seconds()
+                probe.start('transfer')
+                content_type = response.headers.get('Content-Type')
+                if response.status_code == 200 and page_reader.is_html(content_type):
+                    reader = page_reader.PageReader(max_bytes, required, page_reader.charset(content_type))
+                    for chunk in response.iter_content(page_reader.CHUNK_SIZE):
+                        if not reader.add(chunk): break
+                probe.stop('transfer')
+            duration = time.monotonic() - start_time
+            result = async_http.resolve_response(url, cache, entry, response.status_code, response.headers, response.url, reader, duration, probe.as_dict())
+            if result: return result
         except Exception as e:
-            print(f"Attempt {i+1} failed for {url}: {e}")
+            tracing.count('http.errors')
+            _log.warning("Attempt %d failed for %s: %r", i + 1, url, e)
             
-    return None, time.time() - start_time
+    return async_http.FetchResult(url, None, b'', time.monotonic() - start_time)
+
+@tracing.traced('fetch_real_html_timed')
+def fetch_real_html_timed(url, retries=1):
+    """Fetches real HTML and returns (soup, duration_seconds)."""
+    result = _fetch_response_timed(url, retries)
+    if result.status != 200:
+        return None, result.duration
+    return html_parser.make_soup(result.content), result.duration
+
+def _snapshot_from_result(url, result):
+    if result.status != 200:
+        return PageSnapshot(result.url or url, b'', result.duration)
+    features = result.features if result.features is not None else html_features.extract_features(result.content)
+    return PageSnapshot(result.url, result.content, result.duration, features, result.truncated, result.timings)
+
+def fetch_page_snapshot(url, retries=1, required=()):
+    """Downloads and scans a page ONCE. Returns a PageSnapshot (ok is False on failure)."""
+    return _snapshot_from_result(url, _fetch_response_timed(url, retries, required))
+
+async def fetch_page_snapshot_async(url, fetcher, retries=1, required=()):
+    """Async twin of fetch_page_snapshot(), using the engine's AsyncFetcher."""
+    if not url: return PageSnapshot(url)
+    return _snapshot_from_result(url, await fetcher.fetch(_normalize_url(url), retries, required))
+
+def _get_snapshot(url, snapshot):
+    """Uses the shared snapshot when given, otherwise fetches the page (standalone calls)."""
+    if snapshot is None:
+        snapshot = fetch_page_snapshot(url)
+    return snapshot
 
-def fetch_pagespeed_data(url):
+# Metric names for the timing phases (TTFB is reported as server_response_time)
+TIMING_LABELS = {'dns': 'dns_lookup', 'connect': 'tcp_connect', 'tls': 'tls_handshake', 'transfer': 'download_time'}
+
+@tracing.traced('analyze.pagespeed')
+def fetch_pagespeed_data(url, snapshot=None, assets=None):
     """
     REAL LOGIC: Resource Analysis + Real TTFB (Server Response Time).
+    `assets` is the deep-mode asset_probe report (weight, compression, caching), if one was run.
     """
-    soup, duration = fetch_real_html_timed(url)
+    snapshot = _get_snapshot(url, snapshot)
+    features, phases = snapshot.features, snapshot.timings
+    
+    if not snapshot.ok:
+        return _mock_pagespeed(snapshot.timed_out) 
     
-    if not soup:
-        return _mock_pagespeed() 
+    # Score on the server's own response time, not retries / sleeps / download / parsing
+    ttfb = phases['ttfb'] if phases['ttfb'] is not None else snapshot.duration
         
-    scripts = len(soup.find_all('script', src=True))
-    images = len(soup.find_all('img'))
-    styles = len(soup.find_all('link', rel='stylesheet'))
+    scripts = features['script_src_count']
+    images = features['img_count']
+    styles = features['stylesheet_count']
     total_requests = scripts + images + styles
     
     # Calculate Speed Score
-    # Duration < 1.0s = Excellent, < 2.5s = Good, > 2.5s = Poor
+    # TTFB < 0.8s = Good, < 1.8s = Needs Improvement, > 1.8s = Poor
     speed_score = 100
-    if duration > 2.5: speed_score -= 40
-    elif duration > 1.0: speed_score -= 15
+    if ttfb > 1.8: speed_score -= 40
+    elif ttfb > 0.8: speed_score -= 15
     
     # Bloat penalty
     if total_requests > 80: speed_score -= 20
     
+    metrics = {
+        "server_response_time": f"{ttfb:.2f}s",
+        **{TIMING_LABELS[phase]: f"{seconds * 1000:.0f}ms" for phase, seconds in phases.items() if seconds is not None and phase != 'ttfb'},
+        "total_resources": total_requests,
+        "scripts": scripts,
+        "images_loaded": images,
+        "html_size_kb": round(features['bytes_read'] / 1024, 1)
+    }
+    if snapshot.truncated: metrics['html_truncated'] = True # Counts cover only the first MAX_PAGE_BYTES
+    
+    symptoms = []
+    if assets is not None:
+        speed_score -= _score_assets(assets, features['bytes_read'], metrics, symptoms)
+    
     return {
         "score": int(max(10, speed_score)),
-        "metrics": {
-            "server_response_time": f"{duration:.2f}s",
-            "total_resources": total_requests,
-            "scripts": scripts,
-            "images_loaded": images
-        }
+        "metrics": metrics,
+        "symptoms": symptoms
     }
 
-def _mock_pagespeed():
+def _score_assets(assets, html_bytes, metrics, symptoms):
+    """
+    Deep mode: folds the HEAD-probe report into metrics/symptoms. Returns the score penalty.
+    The page weight only counts assets that reported a Content-Length; when some did not (failed,
+    unprobed, no size) it is flagged partial, and a symptom says so once most are missing.
+    """
+    penalty = 0
+    weight_mb = (html_bytes + assets['bytes']) / (1024 * 1024)
+    sized = assets['probed'] - assets['unknown_size']
+    metrics['page_weight_kb'] = round(weight_mb * 1024, 1)
+    metrics['assets_probed'] = f"{assets['probed']}/{assets['discovered']}"
+    metrics['uncompressed_assets'] = len(assets['uncompressed'])
+    metrics['assets_without_cache_headers'] = len(assets['uncached'])
+    if assets['unprobed']: metrics['assets_unprobed'] = assets['unprobed'] # Probe budget ran out
+    if assets['failed']: metrics['assets_failed'] = assets['failed']
+    if assets['unknown_size']: metrics['assets_unknown_size'] = assets['unknown_size']
+    if assets['skipped']: metrics['assets_skipped'] = assets['skipped'] # Beyond SREV_DEEP_MAX_ASSETS
+    if sized < assets['discovered'] + assets['skipped']: metrics['page_weight_partial'] = True
+    if assets['discovered'] and sized * 2 < assets['discovered']:
+        symptoms.append(f"Page weight incomplete: only {sized} of {assets['discovered']} assets reported a size, so the real weight is likely higher.")
+    
+    if weight_mb > 3:
+        symptoms.append(f"Heavy page: {weight_mb:.1f} MB total weight. Ideal: under 3 MB.")
+        penalty += 15
+    if assets['uncompressed']:
+        symptoms.append(f"{len(assets['uncompressed'])} scripts/stylesheets served without compression (gzip/brotli).")
+        penalty += 10
+    if assets['uncached']:
+        symptoms.append(f"{len(assets['uncached'])} assets have no browser caching headers.")
+        penalty += 5
+    return penalty
+
+def _mock_pagespeed(timed_out=False):
     return {
         "score": 0,
-        "metrics": {"total_requests": "Unknown", "error": "Site Unreachable"}
+        "metrics": {"total_requests": "Unknown", "error": "Timed Out" if timed_out else "Site Unreachable"},
+        "symptoms": []
     }
 
-def analyze_seo(url):
+@tracing.traced('analyze.seo')
+def analyze_seo(url, snapshot=None):
     """Real SEO Analysis."""
-    soup, _ = fetch_real_html_timed(url)
+    snapshot = _get_snapshot(url, snapshot)
+    features = snapshot.features
     symptoms = []
     score = 100
     metrics = {}
     
-    if not soup:
+    if not snapshot.ok:
+        if snapshot.timed_out:
+            return {"score": 0, "metrics": {"status": "Timed out"}, "symptoms": ["Website did not respond within the scan time budget."]}
         return {
             "score": 0, 
             "metrics": {"status": "Site access failed"}, 
@@ -113,7 +253,7 @@ def analyze_seo(url):
         }
         
     # Title
-    title = soup.title.string.strip() if soup.title and soup.title.string else None
+    title = (features['title'] or '').strip() or None
     if title:
         metrics['page_title'] = title[:50] + "..." if len(title) > 50 else title
         if len(title) < 10 or len(title) > 65:
@@ -125,9 +265,9 @@ def analyze_seo(url):
         metrics['page_title'] = "MISSING"
 
     # Meta Description
-    meta_desc = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
-    if meta_desc and meta_desc.get("content"):
-        desc_len = len(meta_desc["content"])
+    meta_desc = _meta_description(features)
+    if meta_desc:
+        desc_len = len(meta_desc)
         metrics['meta_desc_len'] = desc_len
         if desc_len < 50:
              symptoms.append("Meta Description too short.")
@@ -138,19 +278,19 @@ def analyze_seo(url):
         metrics['meta_desc_len'] = 0
 
     # H-Tags
-    h1s = soup.find_all('h1')
-    h2s = soup.find_all('h2')
-    metrics['h1_count'] = len(h1s)
-    metrics['h2_count'] = len(h2s)
+    h1_count = features['h1_count']
+    h2_count = features['h2_count']
+    metrics['h1_count'] = h1_count
+    metrics['h2_count'] = h2_count
     
-    if len(h1s) == 0:
+    if h1_count == 0:
         symptoms.append("CRITICAL: No H1 Tag found.")
         score -= 30
-    elif len(h1s) > 1:
-        symptoms.append(f"Multiple H1 Tags ({len(h1s)}) found. Confusing.")
+    elif h1_count > 1:
+        symptoms.append(f"Multiple H1 Tags ({h1_count}) found. Confusing.")
         score -= 10
         
-    if len(h2s) < 2:
+    if h2_count < 2:
         symptoms.append("Weak Content Structure (Few H2 headings).")
         score -= 5
 
@@ -160,7 +300,21 @@ def analyze_seo(url):
         "symptoms": symptoms
     }
 
-def analyze_social(links):
+def _instagram_url(handle):
+    """Accepts @username, username or a full profile URL."""
+    if not handle.startswith('http'): handle = 'https://www.instagram.com/' + handle.replace('@', '')
+    return handle
+
+def _record_source_result(source, page, extracted):
+    """Counts one social/GMB branch outcome: soft_fail = page loaded but its stats were hidden."""
+    if page is None: result = 'missing'
+    elif page.timed_out: result = 'timed_out'
+    elif not page.ok: result = 'unreachable'
+    else: result = 'success' if extracted else 'soft_fail'
+    srev_metrics.SOURCE_RESULTS.inc(source=source, result=result)
+
+@tracing.traced('analyze.social')
+def analyze_social(links, insta_snapshot=None, fb_snapshot=None):
     """
     REAL SCRAPING with 'SOFT FAIL'.
     If scraping fails but page exists (200 OK), give 'Active' partial score.
@@ -171,14 +325,11 @@ def analyze_social(links):
     
     # Instagram
     if links.get('insta'):
-        url = links['insta']
-        if not url.startswith('http'): url = 'https://www.instagram.com/' + url.replace('@', '')
-        
-        soup, _ = fetch_real_html_timed(url, retries=1)
-        if soup:
-            meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
-            if meta and meta.get("content"):
-                content = meta['content'] 
+        url = _instagram_url(links['insta'])
+        page = _get_snapshot(url, insta_snapshot)
+        if page.ok:
+            content = _meta_description(page.features)
+            if content:
                 metrics['ig_meta_data'] = content.split('-')[0].strip()
                 
                 followers_match = re.search(r'([\d\.,kKmM]+)\s+Followers', content)
@@ -203,21 +354,23 @@ def analyze_social(links):
                 # Page loaded, no meta (Login Wall) - Soft Fail
                 metrics['ig_status'] = "Active (Login Block)"
                 score += 40 
+        elif page.timed_out:
+            symptoms.append("Instagram check timed out.")
         else:
             symptoms.append("Instagram Link Unreachable.")
     else:
         symptoms.append("Missing Instagram Profile.")
+    _record_source_result('instagram', page if links.get('insta') else None, 'ig_status' not in metrics)
 
     # Facebook
     if links.get('fb'):
         url = links['fb']
-        soup, _ = fetch_real_html_timed(url, retries=1)
-        if soup:
-            meta = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
-            title = soup.title.get_text() if soup.title else ""
+        page = _get_snapshot(url, fb_snapshot)
+        if page.ok:
+            text = _meta_description(page.features)
+            title = page.features['title'] or ""
             
-            if meta and meta.get("content"):
-                 text = meta['content']
+            if text:
                  metrics['fb_meta_data'] = text[:50] + "..."
                  score += 50
             elif "Facebook" in title:
@@ -227,10 +380,13 @@ def analyze_social(links):
             else:
                  metrics['fb_status'] = "Page Accessible (Stats Hidden)"
                  score += 40
+        elif page.timed_out:
+             symptoms.append("Facebook check timed out.")
         else:
              symptoms.append("Facebook Page Unreachable.")
     else:
         symptoms.append("Missing Facebook Page.")
+    _record_source_result('facebook', page if links.get('fb') else None, 'fb_status' not in metrics)
         
     score = min(score, 100)
     
@@ -240,7 +396,8 @@ def analyze_social(links):
         "symptoms": symptoms
     }
 
-def analyze_gmb(link):
+@tracing.traced('analyze.gmb')
+def analyze_gmb(link, snapshot=None):
     """
     REAL GMB ANALYSIS.
     """
@@ -249,16 +406,16 @@ def analyze_gmb(link):
     metrics = {}
     
     if link:
-        soup, _ = fetch_real_html_timed(link, retries=1)
-        if soup:
-            title = soup.title.get_text() if soup.title else "Unknown"
+        page = _get_snapshot(link, snapshot)
+        if page.ok:
+            title = page.features['title'] if page.features['title'] is not None else "Unknown"
             metrics['gmb_name_found'] = title.replace(" - Google Maps", "")
             
-            text = soup.get_text()
-            rating_match = re.search(r'(\d\.\d)\s+stars', text)
+            # First "<d.d> stars" in the visible text, found during the single scan
+            rating_match = page.features['rating']
             
             if rating_match:
-                rating = float(rating_match.group(1))
+                rating = float(rating_match)
                 metrics['gmb_rating'] = rating
                 if rating < 4.0:
                     symptoms.append(f"Low Reputation: {rating} Stars.")
@@ -273,11 +430,14 @@ def analyze_gmb(link):
                     symptoms.append("Rating hidden from public scan.")
                 else:
                     score = 0
+        elif page.timed_out:
+            symptoms.append("GMB check timed out.")
         else:
             symptoms.append("GMB Link Unreachable.")
             score = 0
     else:
         symptoms.append("No GMB Link provided.")
+    _record_source_result('gmb', page if link else None, 'gmb_rating' in metrics)
         
     return {
         "score": score,
@@ -285,30 +445,31 @@ def analyze_gmb(link):
         "symptoms": symptoms
     }
 
-def analyze_conversion(url):
+@tracing.traced('analyze.conversion')
+def analyze_conversion(url, snapshot=None):
     """CONVERSION INFRASTRUCTURE CHECK"""
-    soup, _ = fetch_real_html_timed(url)
-    if not soup:
-        return {"score": 0, "metrics": {}, "symptoms": ["Site unreachable"]}
+    snapshot = _get_snapshot(url, snapshot)
+    if not snapshot.ok:
+        return {"score": 0, "metrics": {}, "symptoms": ["Site timed out" if snapshot.timed_out else "Site unreachable"]}
     
-    html = str(soup).lower()
+    found = snapshot.features['keywords']
     score = 40 
     symptoms = []
     metrics = {}
     
-    if 'tel:' in html:
+    if found['tel:']:
         metrics['phone_link'] = "Detected"
         score += 20
     else:
         symptoms.append("Missing Click-to-Call Link.")
         
-    if "book" in html or "appointment" in html or "schedule" in html:
+    if found['book'] or found['appointment'] or found['schedule']:
         metrics['booking_keywords'] = "Detected"
         score += 20
     else:
         symptoms.append("No clear 'Book Appointment' wording.")
         
-    if "whatsapp" in html or "chat" in html:
+    if found['whatsapp'] or found['chat']:
         metrics['chat_widget'] = "Detected"
         score += 20
     else:
@@ -320,22 +481,23 @@ def analyze_conversion(url):
         "symptoms": symptoms
     }
 
-def analyze_meta_profile(url):
+@tracing.traced('analyze.meta_profile')
+def analyze_meta_profile(url, snapshot=None):
      """Checks Pixel, Analytics."""
-     soup, _ = fetch_real_html_timed(url)
-     if not soup: return {"score": 0, "metrics": {}, "symptoms": []}
+     snapshot = _get_snapshot(url, snapshot)
+     if not snapshot.ok: return {"score": 0, "metrics": {}, "symptoms": []}
      
-     html_str = str(soup).lower()
+     found = snapshot.features['keywords']
      metrics = {}
      score = 50
      symptoms = []
      
-     has_pixel = "fbq(" in html_str
+     has_pixel = found['fbq(']
      metrics['facebook_pixel'] = has_pixel
      if has_pixel: score += 25
      else: symptoms.append("No Facebook Pixel.")
      
-     has_ga = "gtag(" in html_str
+     has_ga = found['gtag(']
      metrics['google_analytics'] = has_ga
      if has_ga: score += 25
      else: symptoms.append("No Google Analytics.")
@@ -346,47 +508,265 @@ def analyze_meta_profile(url):
          "symptoms": symptoms
      }
 
-def perform_audit(hospital_name, website_url, gmb_link, fb_link, insta_link):
+async def _no_snapshot():
+    return None
+
+async def _snapshot_by(url, fetcher, deadline, required=(), source='website'):
+    """fetch_page_snapshot_async bounded by an absolute loop-time deadline; a late page comes back timed_out."""
+    started = time.perf_counter()
+    snapshot = await _fetch_by(url, fetcher, deadline, required)
+    outcome = 'timed_out' if snapshot.timed_out else 'ok' if snapshot.ok else 'failed'
+    srev_metrics.FETCH_DURATION.observe(time.perf_counter() - started, source=source, outcome=outcome)
+    return snapshot
+
+async def _fetch_by(url, fetcher, deadline, required):
+    fetch = fetch_page_snapshot_async(url, fetcher, required=required)
+    if deadline is None: return await fetch
+    try:
+        return await asyncio.wait_for(fetch, max(0, deadline - asyncio.get_running_loop().time()))
+    except asyncio.TimeoutError:
+        _log.warning("Deadline reached, abandoning %s", url)
+        return PageSnapshot(url, timed_out=True)
+
+def _stage_status(*snapshots):
+    """'ok' when every requested page loaded, 'timed_out' if any hit the deadline, else 'failed'."""
+    pages = [snap for snap in snapshots if snap is not None]
+    if any(snap.timed_out for snap in pages): return 'timed_out'
+    return 'ok' if all(snap.ok for snap in pages) else 'failed'
+
+# --- Per-source audit stages. Each returns (analysis, status); only 'ok' results are cacheable. ---
+
+@tracing.traced('stage.website')
+async def _audit_website(website_url, fetcher, deadline=None, deep=False):
+    site = await _snapshot_by(website_url, fetcher, deadline)
+    assets = None
+    if deep and site.ok:
+        # The probe brings its own budget on top of the page's deadline share (other stages keep theirs)
+        assets = await asset_probe.probe_assets(site.url, site.features['subresources'], fetcher, budget=asset_probe.BUDGET)
+    # Pure parsing from here on, no network
+    analyses = {
+        'pagespeed': fetch_pagespeed_data(website_url, site, assets),
+        'seo': analyze_seo(website_url, site),
+        'conversion': analyze_conversion(website_url, site),
+        'meta': analyze_meta_profile(website_url, site)
+    }
+    return analyses, _stage_status(site)
+
+@tracing.traced('stage.social')
+async def _audit_social(social_links, fetcher, deadline=None):
+    insta_link, fb_link = social_links.get('insta'), social_links.get('fb')
+    required = page_reader.REQUIRED_SIGNALS['social']
+    insta, fb = await asyncio.gather(
+        _snapshot_by(_instagram_url(insta_link), fetcher, deadline, required, 'instagram') if insta_link else _no_snapshot(),
+        _snapshot_by(fb_link, fetcher, deadline, required, 'facebook') if fb_link else _no_snapshot()
+    )
+    return analyze_social(social_links, insta, fb), _stage_status(insta, fb)
+
+@tracing.traced('stage.gmb')
+async def _audit_gmb(gmb_link, fetcher, deadline=None):
+    gmb = await _snapshot_by(gmb_link, fetcher, deadline, page_reader.REQUIRED_SIGNALS['gmb'], 'gmb') if gmb_link else None
+    return analyze_gmb(gmb_link, gmb), _stage_status(gmb)
+
+AUDIT_SOURCES = {'website': _audit_website, 'social': _audit_social, 'gmb': _audit_gmb}
+
+# Share of the audit deadline each source may spend on the network. Sources run concurrently;
+# the headroom below 1.0 is left for analysis and report assembly.
+STAGE_SHARES = {'website': 0.9, 'social': 0.8, 'gmb': 0.8}
+DEADLINE = float(os.getenv('SREV_AUDIT_DEADLINE', '3'))   # seconds, interactive audits; 0 = no deadline
+
+@tracing.traced('perform_audit_async')
+async def perform_audit_async(hospital_name, website_url, gmb_link, fb_link, insta_link, fetcher=None, force_fresh=False, cache=None, deep=False, deadline=None, on_section=None):
     """
-    PARALLEL EXECUTION.
-    Runs scans concurrently to minimize wait time < 3s.
+    ASYNC ENGINE.
+    All pages (website, Instagram, Facebook, GMB) are fetched concurrently on one event loop,
+    bounded per host by the AsyncFetcher, then analyzed. Pass a shared fetcher to reuse its
+    connection pool across many audits (batch mode).
+    Sources still fresh in the result cache are not re-scraped unless force_fresh=True.
+    deep=True also HEAD-probes the website's subresources (page weight, compression, caching).
+    deadline (seconds) bounds the whole audit: each source gets its STAGE_SHARES slice, and pages
+    still loading when it runs out are reported as timed out instead of holding the report back.
+    In deep mode the website stage also gets asset_probe.BUDGET for the probe once its page is in.
+    on_section(name, section, progress) is called as soon as each report section's sources are in
+    (name as in report['digital_biopsy'], progress = fraction of sources done), before the report is built.
     """
+    social_links = {'insta': insta_link, 'fb': fb_link}
+    source_args = {'website': website_url, 'social': social_links, 'gmb': gmb_link}
+    stages = {**AUDIT_SOURCES, 'website': functools.partial(_audit_website, deep=deep)} if deep else AUDIT_SOURCES
+    cache = cache or result_cache.get_cache()
+    keys = result_cache.audit_keys(website_url, gmb_link, fb_link, insta_link)
+    if deep: keys['website'] += '|deep'
+    started = asyncio.get_running_loop().time()
+    srev_metrics.AUDITS_STARTED.inc()
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        # Submit all tasks
-        social_links = {'insta': insta_link, 'fb': fb_link}
-        
-        # Web scan needs only one fetch really, but our logic splits them.
-        # To optimize, we call 'audit_all_web' if we refactored, but for now parallelize the existing functions.
-        # Note: fetch_real_html is called inside each. They will run in parallel.
-        
-        future_pagespeed = executor.submit(fetch_pagespeed_data, website_url)
-        future_seo = executor.submit(analyze_seo, website_url)
-        future_social = executor.submit(analyze_social, social_links)
-        future_gmb = executor.submit(analyze_gmb, gmb_link)
-        future_conversion = executor.submit(analyze_conversion, website_url)
-        future_meta = executor.submit(analyze_meta_profile, website_url)
-        
-        # Gather Results
-        pagespeed = future_pagespeed.result()
-        seo = future_seo.result()
-        public_pulse = future_social.result()
-        gmb_data = future_gmb.result()
-        conversion = future_conversion.result()
-        meta = future_meta.result()
-        
-    structural_score = int((pagespeed['score'] + seo['score']) / 2)
-    structural_details = {**pagespeed['metrics'], **seo['metrics']}
+    results, ages = {}, {}
+    if not force_fresh:
+        for source, key in keys.items():
+            hit = cache.get(source, key)
+            tracing.count('result_cache.hits' if hit else 'result_cache.misses')
+            srev_metrics.RESULT_CACHE.inc(source=source, result='hit' if hit else 'miss')
+            if hit: results[source], ages[source] = hit
+    
+    emitted = set()
+    def emit_ready_sections():
+        if on_section is None: return
+        progress = len(results) / len(AUDIT_SOURCES)
+        for name, sources in SECTION_SOURCES.items():
+            if name not in emitted and all(source in results for source in sources):
+                emitted.add(name)
+                on_section(name, build_section(name, results), progress)
+    
+    missing = [source for source in AUDIT_SOURCES if source not in results]
+    timed_out = []
+    
+    async def run_stage(source):
+        stage_deadline = started + deadline * STAGE_SHARES[source] if deadline else None
+        analysis, status = await stages[source](source_args[source], fetcher, stage_deadline)
+        results[source] = analysis
+        if status == 'ok': cache.put(source, keys[source], analysis)
+        elif status == 'timed_out': timed_out.append(source)
+        emit_ready_sections()
     
-    pulse_score = int((public_pulse['score'] + gmb_data['score']) / 2)
-    pulse_symptoms = public_pulse['symptoms'] + gmb_data['symptoms']
-    pulse_metrics = {**public_pulse['metrics'], **gmb_data['metrics']}
+    emit_ready_sections() # Cache hits
+    if missing:
+        own_fetcher = fetcher is None
+        if own_fetcher: fetcher = async_http.AsyncFetcher()
+        try:
+            await asyncio.gather(*(run_stage(source) for source in missing))
+        finally:
+            if own_fetcher: await fetcher.aclose()
+    
+    web = results['website']
+    report = compile_report(hospital_name, website_url, gmb_link, social_links, web['pagespeed'], web['seo'],
+                            results['social'], results['gmb'], web['conversion'], web['meta'])
+    report['cache'] = {
+        'hit': not missing,
+        'age_seconds': round(max(ages.values()), 1) if ages else 0,
+        'sources': {source: round(age, 1) for source, age in ages.items()}
+    }
+    report['timed_out'] = timed_out
+    if timed_out: tracing.count('audit.timed_out')
+    srev_metrics.AUDITS_COMPLETED.inc(outcome='partial' if timed_out else 'complete')
+    srev_metrics.AUDIT_DURATION.observe(asyncio.get_running_loop().time() - started)
+    tracing.annotate(cache_hit=not missing, fetched=','.join(missing), timed_out=','.join(timed_out))
+    return report
+
+class _AuditLoop:
+    """
+    One long-lived event loop on a daemon thread, with ONE AsyncFetcher, shared by every sync
+    perform_audit() call in the process (all Streamlit sessions). Connections stay pooled across
+    audits and the per-host limits apply process-wide instead of per audit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loop = None
+        self.fetcher = None
+
+    def _start(self):
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, name='srev-audit-loop', daemon=True).start()
+        async def make_fetcher():
+            return async_http.AsyncFetcher()
+        self.fetcher = asyncio.run_coroutine_threadsafe(make_fetcher(), loop).result()
+        self.loop = loop
+
+    def submit(self, make_coro):
+        """
+        Runs make_coro(shared_fetcher) on the shared loop, in the caller's contextvars context
+        (so tracing spans nest under the caller's). Returns a concurrent.futures.Future.
+        """
+        with self._lock:
+            if self.loop is None: self._start()
+        coro = make_coro(self.fetcher)
+        future = concurrent.futures.Future()
+        context = contextvars.copy_context() # Tracing spans started on the loop nest under the caller's
+        def start():
+            if not future.set_running_or_notify_cancel(): return
+            task = context.run(self.loop.create_task, coro)
+            def done(task):
+                if task.cancelled(): future.set_exception(concurrent.futures.CancelledError())
+                elif task.exception() is not None: future.set_exception(task.exception())
+                else: future.set_result(task.result())
+            task.add_done_callback(done)
+        self.loop.call_soon_threadsafe(start)
+        return future
+
+    def stats(self):
+        return self.fetcher.stats() if self.fetcher else None
+
+_audit_loop = _AuditLoop()
+
+def pool_stats():
+    """Connection reuse of the shared audit client (async) and of the standalone sync helpers' pool."""
+    return {'async': _audit_loop.stats(), 'sync': http_session.pool_stats()}
+
+@tracing.traced('perform_audit')
+def perform_audit(hospital_name, website_url, gmb_link, fb_link, insta_link, force_fresh=False, deep=False, deadline=DEADLINE, on_section=None):
+    """
+    PARALLEL EXECUTION.
+    Thin sync wrapper over perform_audit_async: every fetch runs concurrently
+    on one event loop instead of one blocked OS thread per source.
+    Returns within `deadline` seconds (default SREV_AUDIT_DEADLINE), late sources marked timed out.
+    The audit runs on the process-wide audit loop with its shared, pooled fetcher; on_section
+    callbacks are handed back and run on the calling thread as each section completes
+    (Streamlit elements can only be drawn from the script thread).
+    """
+    events = queue.Queue()
+    callback = (lambda *args: events.put(args)) if on_section else None
+    future = _audit_loop.submit(lambda fetcher: perform_audit_async(
+        hospital_name, website_url, gmb_link, fb_link, insta_link, fetcher=fetcher,
+        force_fresh=force_fresh, deep=deep, deadline=deadline, on_section=callback))
+    future.add_done_callback(lambda _: events.put(None))
+    for args in iter(events.get, None):
+        on_section(*args)
+    return future.result()
+
+def _structural_section(pagespeed, seo):
+    return {
+        "score": int((pagespeed['score'] + seo['score']) / 2),
+        "metrics": {**pagespeed['metrics'], **seo['metrics']},
+        "symptoms": pagespeed.get('symptoms', []) + seo['symptoms']
+    }
+
+def _pulse_section(public_pulse, gmb_data):
+    return {
+        "score": int((public_pulse['score'] + gmb_data['score']) / 2),
+        "metrics": {**public_pulse['metrics'], **gmb_data['metrics']},
+        "symptoms": public_pulse['symptoms'] + gmb_data['symptoms']
+    }
+
+# Report section -> audit sources it is built from, and its weight in the health score
+SECTION_SOURCES = {
+    'structural_integrity': ('website',),
+    'public_pulse': ('social', 'gmb'),
+    'conversion_circulation': ('website',),
+    'meta_profile': ('website',)
+}
+SECTION_WEIGHTS = {'structural_integrity': 0.3, 'public_pulse': 0.3, 'conversion_circulation': 0.2, 'meta_profile': 0.2}
+
+def build_section(name, results):
+    """One report['digital_biopsy'] section from the per-source analyses."""
+    if name == 'structural_integrity': return _structural_section(results['website']['pagespeed'], results['website']['seo'])
+    if name == 'public_pulse': return _pulse_section(results['social'], results['gmb'])
+    if name == 'conversion_circulation': return results['website']['conversion']
+    return results['website']['meta']
+
+def partial_health_score(sections):
+    """Health score over the sections available so far, re-weighted (progress display only)."""
+    weight = sum(SECTION_WEIGHTS[name] for name in sections)
+    if not weight: return 0
+    return int(sum(sections[name]['score'] * SECTION_WEIGHTS[name] for name in sections) / weight)
+
+def compile_report(hospital_name, website_url, gmb_link, social_links, pagespeed, seo, public_pulse, gmb_data, conversion, meta):
+    """Aggregates the per-source analyses into the final report dict."""
+    structural = _structural_section(pagespeed, seo)
+    pulse = _pulse_section(public_pulse, gmb_data)
     
     health_score = (
-        (structural_score * 0.3) +
-        (pulse_score * 0.3) +
-        (conversion['score'] * 0.2) +
-        (meta['score'] * 0.2)
+        (structural['score'] * SECTION_WEIGHTS['structural_integrity']) +
+        (pulse['score'] * SECTION_WEIGHTS['public_pulse']) +
+        (conversion['score'] * SECTION_WEIGHTS['conversion_circulation']) +
+        (meta['score'] * SECTION_WEIGHTS['meta_profile'])
     )
     
     return {
@@ -398,16 +778,8 @@ def perform_audit(hospital_name, website_url, gmb_link, fb_link, insta_link):
         },
         "health_score": int(health_score),
         "digital_biopsy": {
-            "structural_integrity": {
-                "score": structural_score,
-                "metrics": structural_details,
-                "symptoms": seo['symptoms']
-            },
-            "public_pulse": {
-                "score": pulse_score,
-                "metrics": pulse_metrics,
-                "symptoms": pulse_symptoms
-            },
+            "structural_integrity": structural,
+            "public_pulse": pulse,
             "conversion_circulation": conversion,
             "meta_profile": meta
         }
@@ -0,0 +1,145 @@
+"""
+BULK AUDIT MODE.
+Runs the audit engine over a CSV/JSONL lead list and streams one JSON line per practice.
+
+    python -m utils.batch_audit leads.csv -o results.jsonl --concurrency 20 --per-host 2 --host-delay 1
+
+Input rows need `name` and `url`; `gmb`, `fb` and `insta` are optional.
+Re-running with the same output file resumes: rows already audited successfully are skipped.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from utils import audit_logic as audit
+from utils import async_http
+from utils import rate_limiter
+
+FIELDS = ('name', 'url', 'gmb', 'fb', 'insta')
+
+def _json_rows(f):
+    for number, line in enumerate(f, 1):
+        if not line.strip(): continue
+        try:
+            raw = json.loads(line)
+        except ValueError as e:
+            raw = e
+        if isinstance(raw, dict):
+            yield raw
+        else:
+            print(f"Skipping line {number}: not a JSON object ({raw})")
+
+def read_rows(path):
+    """
+    Yields normalized input rows from a .csv or .jsonl/.json-lines file.
+    Values are coerced to stripped strings (numbers, null -> ''); malformed JSON lines are skipped.
+    """
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        source = csv.DictReader(f) if path.lower().endswith('.csv') else _json_rows(f)
+        for raw in source:
+            raw = {str(k).strip().lower(): v for k, v in raw.items() if k}
+            yield {k: str(raw.get(k) or '').strip() for k in FIELDS}
+
+def row_key(row):
+    """Stable identity of a row, used to resume after a crash."""
+    ident = '\x1f'.join(row[k].lower() for k in FIELDS)
+    return hashlib.sha1(ident.encode('utf-8')).hexdigest()
+
+def completed_keys(output_path):
+    """Keys of rows that already have a successful result in the output file."""
+    done = set()
+    if not os.path.exists(output_path): return done
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue # Torn last line from a crash
+            if entry.get('status') == 'ok':
+                done.add(entry.get('batch_key'))
+    return done
+
+def _open_output(output_path, resume):
+    if not resume or not os.path.exists(output_path):
+        return open(output_path, 'w', encoding='utf-8')
+    # Terminate a torn last line so the next record starts clean
+    with open(output_path, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n': f.write(b'\n')
+    return open(output_path, 'a', encoding='utf-8')
+
+async def run_batch(rows, output_path, concurrency=20, per_host=2, host_delay=1.0, resume=True, deep=False, deadline=None):
+    """
+    Audits every row with at most `concurrency` audits in flight, sharing one AsyncFetcher
+    (per-host limit + politeness delay apply across the whole batch).
+    Each result is appended to output_path as soon as it finishes. Returns a summary dict.
+    """
+    skip = completed_keys(output_path) if resume else set()
+    stats = {'ok': 0, 'error': 0, 'skipped': 0}
+    started = time.time()
+    rows = iter(rows)
+    out = _open_output(output_path, resume)
+
+    async def worker(fetcher):
+        for row in rows:
+            key = row_key(row)
+            if key in skip or not row['url']:
+                stats['skipped'] += 1
+                continue
+            skip.add(key) # Duplicate rows in the same input are audited once
+            entry = {'batch_key': key, 'input': row}
+            try:
+                entry['result'] = await audit.perform_audit_async(row['name'], row['url'], row['gmb'], row['fb'], row['insta'], fetcher=fetcher, deep=deep, deadline=deadline)
+                entry['status'] = 'ok'
+            except Exception as e:
+                entry['status'] = 'error'
+                entry['error'] = f"{type(e).__name__}: {e}"
+            entry['finished_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            out.write(json.dumps(entry) + '\n')
+            out.flush()
+            stats[entry['status']] += 1
+            score = entry.get('result', {}).get('health_score', '-')
+            print(f"[{stats['ok'] + stats['error']}] {row['name'] or row['url']}: {entry['status']} (score {score})")
+
+    try:
+        async with async_http.AsyncFetcher(per_host_limit=per_host, politeness_delay=host_delay) as fetcher:
+            await asyncio.gather(*(worker(fetcher) for _ in range(max(1, concurrency))))
+    finally:
+        out.close()
+
+    stats['elapsed_seconds'] = round(time.time() - started, 2)
+    stats['rate_limits'] = rate_limiter.limiter_stats()
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run SREV digital biopsies for a CSV/JSONL list of practices.")
+    parser.add_argument('input', help="CSV or JSONL with columns name,url,gmb,fb,insta")
+    parser.add_argument('-o', '--output', help="JSONL results file (default: <input>.results.jsonl)")
+    parser.add_argument('--concurrency', type=int, default=20, help="audits in flight at once")
+    parser.add_argument('--per-host', type=int, default=2, help="parallel requests allowed per host")
+    parser.add_argument('--host-delay', type=float, default=1.0, help="min seconds between requests to one host")
+    parser.add_argument('--fresh', action='store_true', help="overwrite the output instead of resuming")
+    parser.add_argument('--deep', action='store_true', help="also HEAD-probe each website's assets (weight, compression, caching)")
+    parser.add_argument('--deadline', type=float, default=0, help="seconds allowed per audit, late sources marked timed out (0 = no limit)")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.input)[0] + '.results.jsonl'
+    stats = asyncio.run(run_batch(
+        read_rows(args.input), output,
+        concurrency=args.concurrency, per_host=args.per_host, host_delay=args.host_delay, resume=not args.fresh, deep=args.deep, deadline=args.deadline
+    ))
+    print(f"Done: {stats['ok']} ok, {stats['error']} failed, {stats['skipped']} skipped in {stats['elapsed_seconds']}s -> {output}")
+    for host, host_stats in stats['rate_limits'].items():
+        if host_stats['delayed'] or host_stats['throttled']:
+            print(f"  {host}: {host_stats['delayed']}/{host_stats['requests']} requests queued "
+                  f"({host_stats['wait_seconds']}s total, max {host_stats['max_wait']}s), {host_stats['throttled']} x 429")
+    return 0 if stats['error'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,12 +2,25 @@ import firebase_admin
 from firebase_admin import credentials, firestore
 import datetime
 import os
+import time
+import threading
 import json
+import uuid
+from utils import local_store
+from utils import record_index
+from utils import tracing
+from utils import metrics
 
 # Mock database for demonstration if Firebase creds are missing
 MOCK_DB = []
 
-def initialize_firebase():
+# Backend handle, selected ONCE per process (Firestore client, or None = local DB)
+_backend = None
+_backend_ready = False
+_backend_lock = threading.Lock()
+BACKEND_INFO = {"backend": None, "init_seconds": None}
+
+def _connect_backend():
     """Initializes Firebase app or sets up mock if credentials missing."""
     try:
         # Check if we have credentials (e.g., in env var or file)
@@ -17,6 +30,9 @@ def initialize_firebase():
             if not firebase_admin._apps:
                 firebase_admin.initialize_app(cred)
             return firestore.client()
+        elif os.getenv('FIRESTORE_EMULATOR_HOST'):
+            # Local Firestore emulator (no credentials needed)
+            return firestore.Client(project=os.getenv('GCLOUD_PROJECT', 'srev-local'))
         else:
             print("No Firebase credentials found. Using Mock DB.")
             return None
@@ -24,57 +40,206 @@ def initialize_firebase():
         print(f"Error initializing Firebase: {e}")
         return None
 
+def initialize_firebase():
+    """Returns the cached backend (Firestore client or None for local), creating it on first use. Thread-safe."""
+    global _backend, _backend_ready
+    if _backend_ready:
+        return _backend
+    with _backend_lock:
+        if not _backend_ready:
+            start = time.perf_counter()
+            _backend = _connect_backend()
+            BACKEND_INFO["backend"] = "firestore" if _backend else "local"
+            BACKEND_INFO["init_seconds"] = round(time.perf_counter() - start, 4)
+            _backend_ready = True
+    return _backend
+
+def warm_up():
+    """Selects the backend ahead of the first save. Returns BACKEND_INFO (backend + setup time)."""
+    initialize_firebase()
+    return dict(BACKEND_INFO)
+
+def reset_backend():
+    """Forgets the cached backend so the next call re-reads credentials (e.g. after rotating them)."""
+    global _backend, _backend_ready
+    with _backend_lock:
+        _backend, _backend_ready = None, False
+
+# Firestore accepts at most 500 writes per batch
+FIRESTORE_BATCH_LIMIT = 500
+
+def new_patient_id(now=None):
+    """pat_<unix seconds>_<random hex>: still sorts by time, unique across concurrent audits."""
+    now = now or datetime.datetime.now()
+    return f"pat_{int(now.timestamp())}_{uuid.uuid4().hex[:12]}"
+
+def stamp_record(data):
+    """Adds created_at / patient_id (kept if already set, e.g. when queued earlier)."""
+    now = datetime.datetime.now()
+    data.setdefault('created_at', now.isoformat())
+    if not data.get('patient_id'): data['patient_id'] = new_patient_id(now)
+    return data
+
+@tracing.traced('db.save_patient_file')
 def save_patient_file(data):
     """Saves the audit data to Firestore or Mock DB."""
+    return save_patient_files([data])
+
+@tracing.traced('db.save_patient_files')
+def save_patient_files(records):
+    """Saves several audits in ONE round trip: a Firestore batched write or a single grouped local append."""
     db = initialize_firebase()
+    backend = 'firestore' if db else 'local'
+    tracing.annotate(records=len(records), backend=backend)
     
     # Add timestamp
-    data['created_at'] = datetime.datetime.now().isoformat()
-    data['patient_id'] = f"pat_{int(datetime.datetime.now().timestamp())}"
+    for data in records:
+        stamp_record(data)
     
+    started = time.perf_counter()
+    ok, message = _write_records(db, records)
+    metrics.DB_WRITE_DURATION.observe(time.perf_counter() - started, backend=backend, outcome='ok' if ok else 'error')
+    if ok: metrics.DB_RECORDS.inc(len(records), backend=backend)
+    return ok, message
+
+def _write_records(db, records):
     if db:
         try:
-            db.collection('Patient_Audit').add(data)
+            for i in range(0, len(records), FIRESTORE_BATCH_LIMIT):
+                batch = db.batch()
+                collection = db.collection('Patient_Audit')
+                for data in records[i:i + FIRESTORE_BATCH_LIMIT]:
+                    # Keyed by patient_id: a write-behind retry after an ambiguous commit overwrites, never duplicates
+                    batch.set(collection.document(data['patient_id']), data)
+                batch.commit()
             return True, "Saved to Firestore"
         except Exception as e:
             return False, f"Firestore Error: {e}"
     else:
-        # Save to Local JSON File (Persistent Mock DB)
+        # Save to Local JSON-Lines File (Persistent Mock DB, append-only)
         try:
-            filename = "srev_db.json"
-            if os.path.exists(filename):
-                with open(filename, "r") as f:
-                    try:
-                        current_db = json.load(f)
-                    except: 
-                        current_db = []
-            else:
-                current_db = []
-            
-            current_db.append(data)
-            
-            with open(filename, "w") as f:
-                json.dump(current_db, f, indent=4)
-                
+            local_store.append_many(records)
             return True, "Saved to Local Admin DB"
         except Exception as e:
             return False, f"Local DB Error: {e}"
 
+# --- Firestore read path ---
+COLLECTION = 'Patient_Audit'
+SUMMARY_FIELDS = ['patient_id', 'created_at', 'health_score', 'hospital_info.name']
+FIRESTORE_SORT_FIELDS = {'created_at': 'created_at', 'name': 'hospital_info.name', 'health_score': 'health_score'}
+FIRESTORE_PAGE_SIZE = 200
+
+def _firestore_summary(doc):
+    d = doc.to_dict() or {}
+    score = d.get('health_score')
+    return {
+        'doc_id': doc.id,
+        'patient_id': d.get('patient_id'),
+        'created_at': d.get('created_at') or '',
+        'name': (d.get('hospital_info') or {}).get('name') or '',
+        'health_score': score if isinstance(score, (int, float)) else -1
+    }
+
+def stream_firestore_pages(query, page_size=FIRESTORE_PAGE_SIZE):
+    """Yields the documents of an ordered query page by page (cursor pagination, start_after)."""
+    cursor = None
+    while True:
+        page = query.limit(page_size)
+        if cursor is not None: page = page.start_after(cursor)
+        docs = list(page.stream())
+        yield from docs
+        if len(docs) < page_size: return
+        cursor = docs[-1]
+
+def _firestore_query(db, sort_by, descending, name_prefix=None, min_score=None, max_score=None, date_from=None, date_to=None):
+    """
+    Projected (summary fields only), ordered query. Range filters on the sort field run
+    server-side; returns (query, client_side_filter) for the rest.
+    The name prefix is always matched client-side: Firestore string ranges are case-sensitive,
+    and the search must match the local index (case-insensitive) whatever the sort order.
+    """
+    field = FIRESTORE_SORT_FIELDS[sort_by]
+    ranges = {
+        'created_at': (date_from, date_to + '\uf8ff' if date_to else None),
+        'name': (name_prefix, name_prefix + '\uf8ff' if name_prefix else None),
+        'health_score': (min_score, max_score)
+    }
+    query = db.collection(COLLECTION).select(SUMMARY_FIELDS)
+    low, high = ranges.pop(sort_by) if sort_by != 'name' else (None, None)
+    if low is not None: query = query.where(filter=firestore.FieldFilter(field, '>=', low))
+    if high is not None: query = query.where(filter=firestore.FieldFilter(field, '<=', high))
+    query = query.order_by(field, direction=firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING)
+    
+    others = {k: v for k, v in ranges.items() if v != (None, None)}
+    if not others:
+        return query, None
+    
+    def matches(row):
+        for key, (lo, hi) in others.items():
+            value = row[key].lower() if key == 'name' else row[key]
+            if key == 'name': lo, hi = lo.lower(), hi.lower()
+            if lo is not None and value < lo: return False
+            if hi is not None and value > hi: return False
+        return True
+    return query, matches
+
+def _firestore_count(query):
+    result = query.count().get()
+    return int(result[0][0].value)
+
+def _firestore_query_records(db, sort_by, descending, offset, limit, **filters):
+    query, matches = _firestore_query(db, sort_by, descending, **filters)
+    if matches is None:
+        # Fully server-side: count aggregation + one projected page
+        docs = query.offset(offset).limit(limit).stream()
+        return [_firestore_summary(doc) for doc in docs], _firestore_count(query)
+    # Client-side filter: stream projected pages, keep only the requested window
+    rows, total = [], 0
+    for doc in stream_firestore_pages(query):
+        row = _firestore_summary(doc)
+        if not matches(row): continue
+        if offset <= total < offset + limit: rows.append(row)
+        total += 1
+    return rows, total
+
+def iter_all_records(db=None):
+    """Streams every full record (Firestore pages or local log) without loading the DB at once."""
+    db = db or initialize_firebase()
+    if db:
+        query = db.collection(COLLECTION).order_by('created_at')
+        for doc in stream_firestore_pages(query):
+            yield doc.to_dict()
+    else:
+        yield from local_store.iter_records()
+
 def get_all_records():
     """Retrieves all records from Local DB or Firestore."""
-    db = initialize_firebase()
+    return list(iter_all_records())
+
+def query_records(sort_by='created_at', descending=True, offset=0, limit=25, db=None, **filters):
+    """
+    Indexed, paginated admin query. Returns (summary_rows, total_matches).
+    Rows hold only created_at, name, health_score and patient_id; load the full
+    record with get_record(). Filters: name_prefix, min_score, max_score, date_from, date_to.
+    """
+    db = db or initialize_firebase()
     if db:
-        # Fetch from Firestore (Simplification)
-        return [] 
-    else:
-        # Fetch from Local File
-        if os.path.exists("srev_db.json"):
-            with open("srev_db.json", "r") as f:
-                try:
-                    return json.load(f)
-                except:
-                    return []
-        return []
+        return _firestore_query_records(db, sort_by, descending, offset, limit, **filters)
+    return record_index.get_index().query(sort_by, descending, offset, limit, **filters)
+
+def get_record(patient_id, db=None):
+    """Fetches one full audit record on demand."""
+    db = db or initialize_firebase()
+    if db:
+        query = db.collection(COLLECTION).where(filter=firestore.FieldFilter('patient_id', '==', patient_id)).limit(1)
+        for doc in query.stream():
+            return doc.to_dict()
+        return None
+    return record_index.get_index().get_record(patient_id)
+
+def export_all_json():
+    """Full DB as a JSON array (same format as the old srev_db.json). Built only when called."""
+    return json.dumps(get_all_records(), indent=4)
 
 def trigger_admin_email(data):
     """Simulates sending an email to the admin."""
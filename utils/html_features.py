@@ -0,0 +1,200 @@
+import re
+import codecs
+from html.parser import HTMLParser
+from utils import tracing
+
+# Substrings the conversion / meta analyzers look for anywhere in the page source
+KEYWORDS = ('tel:', 'book', 'appointment', 'schedule', 'whatsapp', 'chat', 'fbq(', 'gtag(')
+RATING_PATTERN = re.compile(r'(\d\.\d)\s+stars')
+_CHARSET_PATTERN = re.compile(rb'charset=["\']?([A-Za-z0-9_.:-]+)')
+_MAX_TITLE_CHARS = 1024
+_TEXT_TAIL_CHARS = 64
+_KEYWORD_TAIL_CHARS = max(len(k) for k in KEYWORDS) - 1
+_MAX_SUBRESOURCES = 500
+_SNIFF_BYTES = 2048   # bytes buffered before the encoding is chosen (BOM / <meta charset>)
+_BOMS = ((codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'), (codecs.BOM_UTF8, 'utf-8-sig'),
+         (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+def _codec_name(label):
+    try:
+        return codecs.lookup(label).name
+    except (LookupError, TypeError):
+        return None
+
+class _Utf8OrCp1252Decoder:
+    """Undeclared pages: UTF-8 until the first invalid byte, cp1252 from there on (like a browser's legacy guess)."""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def decode(self, data, final=False):
+        try:
+            return self._decoder.decode(data, final)
+        except UnicodeDecodeError:
+            pending = self._decoder.getstate()[0] # A failed decode leaves the buffered bytes untouched
+            self._decoder = codecs.getincrementaldecoder('cp1252')(errors='replace')
+            return self._decoder.decode(pending + data, final)
+
+def empty_features():
+    return {
+        'title': None,              # text of the first <title>, None if there is none
+        'meta_description': None,   # content of the first <meta name="description"> ('' if no content)
+        'og_description': None,     # content of the first <meta property="og:description">
+        'h1_count': 0,
+        'h2_count': 0,
+        'script_src_count': 0,
+        'img_count': 0,
+        'stylesheet_count': 0,
+        'keywords': {k: False for k in KEYWORDS},
+        'rating': None,             # first "<d.d> stars" in the visible text
+        'head_complete': False,     # </head> or <body> seen: every head-only signal is final
+        'subresources': [],         # (kind, raw url) of scripts, images and stylesheets, in page order
+        'bytes_read': 0
+    }
+
+class FeatureExtractor(HTMLParser):
+    """
+    Single-pass, event-driven extractor over the raw byte stream. feed() chunks as they
+    arrive; no tree is built. Memory stays bounded: only the parser's pending-tag buffer,
+    short rolling tails for keyword/rating matches, and the title text are kept.
+    `encoding` is the charset from the HTTP Content-Type header, if any.
+    """
+
+    def __init__(self, encoding=None):
+        super().__init__(convert_charrefs=True)
+        self.features = empty_features()
+        self._encoding = encoding
+        self._decoder = None
+        self._sniff = b''
+        self._keyword_tail = ''
+        self._text_tail = ''
+        self._raw_text_tag = None     # inside <script>/<style>: not visible text
+        self._in_title = False
+        self._title_parts = None
+        self._pending_keywords = set(KEYWORDS)
+
+    # --- byte stream ---
+
+    def _make_decoder(self, head):
+        """Like browsers: BOM, then the HTTP header charset, then <meta charset>, else UTF-8 with a cp1252 fallback."""
+        encoding = next((name for bom, name in _BOMS if head.startswith(bom)), None) or _codec_name(self._encoding)
+        if not encoding:
+            match = _CHARSET_PATTERN.search(head)
+            encoding = match and _codec_name(match.group(1).decode('ascii', 'replace'))
+        if not encoding: return _Utf8OrCp1252Decoder()
+        return codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def feed_bytes(self, chunk, final=False):
+        self.features['bytes_read'] += len(chunk)
+        if self._decoder is None:
+            # Hold the first bytes back until the encoding can be chosen, whatever the chunk size
+            self._sniff += chunk
+            if len(self._sniff) < _SNIFF_BYTES and not final: return
+            chunk, self._sniff = self._sniff, b''
+            self._decoder = self._make_decoder(chunk)
+        text = self._decoder.decode(chunk, final)
+        if not text: return
+        self._scan_keywords(text.lower())
+        self.feed(text)
+
+    def finish(self):
+        """Flushes buffered input and returns the features dict."""
+        self.feed_bytes(b'', final=True)
+        self.close()
+        if self._title_parts is not None and self.features['title'] is None:
+            self.features['title'] = ''.join(self._title_parts)
+        return self.features
+
+    def _scan_keywords(self, lowered):
+        if not self._pending_keywords: return
+        window = self._keyword_tail + lowered
+        for keyword in list(self._pending_keywords):
+            if keyword in window:
+                self.features['keywords'][keyword] = True
+                self._pending_keywords.discard(keyword)
+        self._keyword_tail = window[-_KEYWORD_TAIL_CHARS:]
+
+    # --- parser events ---
+
+    def handle_starttag(self, tag, attrs):
+        f = self.features
+        if tag == 'h1': f['h1_count'] += 1
+        elif tag == 'h2': f['h2_count'] += 1
+        elif tag == 'img':
+            f['img_count'] += 1
+            self._add_subresource('image', attrs, 'src')
+        elif tag == 'script':
+            if any(name == 'src' for name, _ in attrs):
+                f['script_src_count'] += 1
+                self._add_subresource('script', attrs, 'src')
+            self._raw_text_tag = tag
+        elif tag == 'style':
+            self._raw_text_tag = tag
+        elif tag == 'link':
+            rel = next((value for name, value in attrs if name == 'rel'), None) or ''
+            if 'stylesheet' in rel.split():
+                f['stylesheet_count'] += 1
+                self._add_subresource('stylesheet', attrs, 'href')
+        elif tag == 'meta':
+            self._handle_meta(dict(attrs))
+        elif tag == 'title' and self._title_parts is None:
+            self._title_parts = []
+            self._in_title = True
+        elif tag == 'body':
+            f['head_complete'] = True
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in ('script', 'style'): self._raw_text_tag = None
+        if tag == 'title': self._end_title()
+
+    def _add_subresource(self, kind, attrs, attr):
+        url = next((value for name, value in attrs if name == attr), None)
+        if url and not url.startswith('data:') and len(self.features['subresources']) < _MAX_SUBRESOURCES:
+            self.features['subresources'].append((kind, url.strip()))
+
+    def _handle_meta(self, attrs):
+        content = attrs.get('content') or ''
+        if attrs.get('name') == 'description' and self.features['meta_description'] is None:
+            self.features['meta_description'] = content
+        if attrs.get('property') == 'og:description' and self.features['og_description'] is None:
+            self.features['og_description'] = content
+
+    def _end_title(self):
+        if self._in_title:
+            self._in_title = False
+            self.features['title'] = ''.join(self._title_parts)
+
+    def handle_endtag(self, tag):
+        if tag == self._raw_text_tag: self._raw_text_tag = None
+        elif tag == 'title': self._end_title()
+        elif tag == 'head': self.features['head_complete'] = True
+
+    def handle_data(self, data):
+        if self._raw_text_tag: return
+        if self._in_title and sum(map(len, self._title_parts)) < _MAX_TITLE_CHARS:
+            self._title_parts.append(data)
+        if self.features['rating'] is None:
+            window = self._text_tail + data
+            match = RATING_PATTERN.search(window)
+            if match:
+                self.features['rating'] = match.group(1)
+            self._text_tail = window[-_TEXT_TAIL_CHARS:]
+
+    def found(self, required):
+        """True once every feature in `required` has been seen (for early termination)."""
+        f = self.features
+        for name in required:
+            if name in KEYWORDS:
+                if not f['keywords'][name]: return False
+            elif f.get(name) in (None, False):
+                return False
+        return True
+
+@tracing.traced('parse.features')
+def extract_features(content, chunk_size=65536, encoding=None):
+    """Runs the extractor over complete page bytes (`encoding` = HTTP header charset, if known)."""
+    extractor = FeatureExtractor(encoding)
+    for i in range(0, len(content), chunk_size):
+        extractor.feed_bytes(content[i:i + chunk_size])
+    return extractor.finish()
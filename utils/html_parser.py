@@ -0,0 +1,27 @@
+import os
+import importlib.util
+from bs4 import BeautifulSoup
+from utils import tracing
+
+# BeautifulSoup tree builders, fastest first. Force one with SREV_HTML_PARSER=lxml|html.parser|html5lib.
+PARSER_PREFERENCE = ('lxml', 'html.parser')
+_BUILDER_MODULES = {'lxml': 'lxml', 'html5lib': 'html5lib', 'html.parser': None}
+
+def available_parsers():
+    """Tree builders importable in this environment (html.parser is always there)."""
+    return [name for name, module in _BUILDER_MODULES.items() if module is None or importlib.util.find_spec(module)]
+
+def select_parser(requested=None):
+    available = available_parsers()
+    requested = requested or os.getenv('SREV_HTML_PARSER')
+    if requested:
+        if requested in available: return requested
+        print(f"HTML parser '{requested}' not installed, falling back.")
+    return next(name for name in PARSER_PREFERENCE if name in available)
+
+PARSER = select_parser()
+
+@tracing.traced('parse.soup')
+def make_soup(content, parser=None):
+    """Parses HTML bytes with the fastest available backend (lxml, else html.parser)."""
+    return BeautifulSoup(content, parser or PARSER)
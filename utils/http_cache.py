@@ -0,0 +1,158 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from utils import page_reader
+
+# On-disk HTTP validator cache (ETag / Last-Modified). Disable with SREV_HTTP_CACHE=0.
+ENABLED = os.getenv('SREV_HTTP_CACHE', '1') != '0'
+CACHE_DIR = os.getenv('SREV_HTTP_CACHE_DIR', '.srev_http_cache')
+MAX_BYTES = int(float(os.getenv('SREV_HTTP_CACHE_MB', '64')) * 1024 * 1024)
+MAX_ENTRIES = int(os.getenv('SREV_HTTP_CACHE_ENTRIES', '2000'))
+
+class HttpCache:
+    """
+    Stores the body + validators of 200 responses. Repeat fetches send If-None-Match /
+    If-Modified-Since; on 304 Not Modified the stored body is reused, so only headers cross
+    the wire. Evicts least-recently-used entries beyond max_bytes / max_entries.
+    A body that stopped early (social/GMB pages read up to </head> or the rating) is stored as
+    partial, with the signals it holds; it is only revalidated for fetches needing no more than that.
+    Each entry is two files (<sha256>.body, <sha256>.json) written via atomic rename.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES, max_entries=MAX_ENTRIES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._index = None   # digest -> [size, last_used]
+        self._bytes = 0
+        self.stats = {'revalidated': 0, 'changed': 0, 'stored': 0, 'evictions': 0}
+
+    def _paths(self, url):
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return digest, base + '.json', base + '.body'
+
+    def _load_index(self):
+        """Scans the cache directory once per process."""
+        if self._index is not None: return
+        self._index, self._bytes = {}, 0
+        os.makedirs(self.directory, exist_ok=True)
+        for name in os.listdir(self.directory):
+            if not name.endswith('.body'): continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            self._index[name[:-5]] = [stat.st_size, stat.st_mtime]
+            self._bytes += stat.st_size
+
+    def _write_atomic(self, path, data):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _drop(self, digest):
+        base = os.path.join(self.directory, digest)
+        for path in (base + '.json', base + '.body'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        size = self._index.pop(digest, [0])[0]
+        self._bytes -= size
+
+    def _evict(self):
+        if self._bytes <= self.max_bytes and len(self._index) <= self.max_entries: return
+        for digest, _ in sorted(self._index.items(), key=lambda item: item[1][1]):
+            if self._bytes <= self.max_bytes and len(self._index) <= self.max_entries: break
+            self._drop(digest)
+            self.stats['evictions'] += 1
+
+    def request_headers(self, url, headers, required=()):
+        """
+        Adds validators for a cached URL to `headers`. Returns the cache entry (or None).
+        A partial entry lacking any of the `required` signals is ignored (full fetch instead).
+        """
+        _, meta_path, _ = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('partial') and not (required and set(required) <= set(entry.get('signals', ()))):
+            return None
+        if entry.get('etag'): headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'): headers['If-Modified-Since'] = entry['last_modified']
+        return entry
+
+    def handle_response(self, url, entry, status, response_headers, body, final_url, complete=True, signals=None):
+        """
+        Resolves a response against the cache. Returns (status, body, final_url, revalidated).
+        304 + stored body -> (200, stored body, ...). A complete 200 with validators is stored;
+        so is an incomplete one given the `signals` it was read for (stopped early), flagged partial.
+        Bodies cut at the byte cap are never stored.
+        """
+        digest, meta_path, body_path = self._paths(url)
+        if status == 304 and entry is not None:
+            try:
+                with open(body_path, 'rb') as f:
+                    cached = f.read()
+            except OSError:
+                cached = None
+            with self._lock:
+                self._load_index()
+                if cached is None:
+                    self._drop(digest) # Body evicted meanwhile: next attempt refetches in full
+                    return status, body, final_url, False
+                self.stats['revalidated'] += 1
+                if digest in self._index: self._index[digest][1] = time.time()
+                try:
+                    os.utime(body_path) # LRU age survives restarts (the index is rebuilt from mtimes)
+                except OSError:
+                    pass # Evicted (e.g. by another process) after we read it: the body in hand is still valid
+            return 200, cached, entry.get('final_url') or final_url, True
+
+        if status == 200:
+            etag, last_modified = response_headers.get('ETag'), response_headers.get('Last-Modified')
+            if (complete or signals) and (etag or last_modified):
+                self._store(digest, meta_path, body_path, body, {
+                    'url': url, 'final_url': final_url, 'etag': etag, 'last_modified': last_modified,
+                    'stored_at': time.time(), 'size': len(body),
+                    'charset': page_reader.charset(response_headers.get('Content-Type')),  # to re-extract the body on 304
+                    'partial': not complete, 'signals': [] if complete else list(signals)
+                })
+            if entry is not None: self.stats['changed'] += 1
+        return status, body, final_url, False
+
+    def _store(self, digest, meta_path, body_path, body, meta):
+        if len(body) > self.max_bytes: return
+        with self._lock:
+            self._load_index()
+            if digest in self._index: self._bytes -= self._index[digest][0]
+            self._write_atomic(body_path, body)
+            self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+            self._index[digest] = [len(body), time.time()]
+            self._bytes += len(body)
+            self.stats['stored'] += 1
+            self._evict()
+
+    def info(self):
+        with self._lock:
+            self._load_index()
+            return {**self.stats, 'entries': len(self._index), 'bytes': self._bytes}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Process-wide HTTP cache, or None when disabled (SREV_HTTP_CACHE=0)."""
+    global _cache
+    if not ENABLED: return None
+    with _cache_lock:
+        if _cache is None: _cache = HttpCache()
+        return _cache
@@ -0,0 +1,116 @@
+import os
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Pool / retry policy. Override with env vars or configure(...) at startup.
+DEFAULT_CONFIG = {
+    'pool_connections': int(os.getenv('SREV_HTTP_POOL_HOSTS', '32')),   # hosts kept in the pool
+    'pool_maxsize': int(os.getenv('SREV_HTTP_POOL_SIZE', '10')),        # open connections per host
+    'keep_alive': os.getenv('SREV_HTTP_KEEP_ALIVE', '1') != '0',
+    'retries': int(os.getenv('SREV_HTTP_RETRIES', '2')),
+    'backoff_factor': float(os.getenv('SREV_HTTP_BACKOFF', '0.5')),
+    'status_forcelist': (500, 502, 503, 504, 429),
+}
+
+class SessionManager:
+    """
+    Process-wide HTTP connection pooling.
+    ONE HTTPAdapter (urllib3 PoolManager, thread-safe) holds a connection pool per host.
+    Each thread gets its own lightweight requests.Session mounted on that shared adapter,
+    so audit workers and concurrent Streamlit sessions reuse TCP/TLS connections safely.
+    """
+
+    def __init__(self, **config):
+        self.config = {**DEFAULT_CONFIG, **config}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._adapter = None
+        self._generation = 0
+        # Counters of pools evicted from the PoolManager (so stats never go backwards)
+        self._evicted = {'requests': 0, 'connections': 0}
+
+    def _build_adapter(self):
+        c = self.config
+        retry = Retry(
+            connect=c['retries'], read=c['retries'], redirect=c['retries'],
+            backoff_factor=c['backoff_factor'], status_forcelist=list(c['status_forcelist'])
+        )
+        adapter = HTTPAdapter(pool_connections=c['pool_connections'], pool_maxsize=c['pool_maxsize'], max_retries=retry)
+        pools = adapter.poolmanager.pools
+        close_pool = pools.dispose_func
+
+        def on_evict(pool):
+            with self._lock:
+                self._evicted['requests'] += pool.num_requests
+                self._evicted['connections'] += pool.num_connections
+            if close_pool: close_pool(pool)
+
+        pools.dispose_func = on_evict
+        return adapter
+
+    def get_adapter(self):
+        with self._lock:
+            if self._adapter is None:
+                self._adapter = self._build_adapter()
+            return self._adapter
+
+    def get_session(self):
+        """Returns this thread's session, bound to the shared connection pools."""
+        adapter = self.get_adapter()
+        session = getattr(self._local, 'session', None)
+        if session is None or self._local.generation != self._generation:
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if not self.config['keep_alive']:
+                session.headers['Connection'] = 'close'
+            self._local.session = session
+            self._local.generation = self._generation
+        return session
+
+    def configure(self, **config):
+        """Changes pool/retry policy. Existing pools are closed; sessions rebuild lazily."""
+        with self._lock:
+            self.config.update(config)
+            old, self._adapter = self._adapter, None
+            self._generation += 1
+        if old: old.close()
+
+    def stats(self):
+        """Pool hit/miss counters. A miss is a newly opened connection, a hit is a reused one."""
+        with self._lock:
+            adapter = self._adapter
+            total_requests = self._evicted['requests']
+            total_connections = self._evicted['connections']
+        hosts = {}
+        if adapter:
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None: continue
+                total_requests += pool.num_requests
+                total_connections += pool.num_connections
+                hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                    'requests': pool.num_requests,
+                    'connections_opened': pool.num_connections
+                }
+        return {
+            'pool_hits': max(0, total_requests - total_connections),
+            'pool_misses': total_connections,
+            'requests': total_requests,
+            'hosts': hosts
+        }
+
+# Shared registry used by the whole process
+_manager = SessionManager()
+
+def get_session():
+    return _manager.get_session()
+
+def configure(**config):
+    _manager.configure(**config)
+
+def pool_stats():
+    return _manager.stats()
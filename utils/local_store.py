@@ -0,0 +1,101 @@
+import os
+import json
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+# Append-only JSON-Lines database: one audit per line, each save is a single O(1) append.
+DB_PATH = "srev_db.jsonl"
+LEGACY_DB_PATH = "srev_db.json"   # Old whole-file JSON array, migrated once
+
+_thread_lock = threading.Lock()
+_migrated = False
+
+@contextmanager
+def file_lock(path=DB_PATH):
+    """Exclusive lock shared by every thread AND process writing the DB."""
+    with _thread_lock:
+        with open(path + ".lock", "a+b") as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _encode(record):
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+def _migrate_legacy_locked(path, legacy_path):
+    """Converts srev_db.json to JSON-Lines (atomic rename). The legacy file is left untouched."""
+    if os.path.exists(path) or not os.path.exists(legacy_path):
+        return 0
+    try:
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+    except (ValueError, OSError) as e:
+        print(f"Legacy DB not migrated ({e}). Starting a fresh log.")
+        records = []
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        for record in records:
+            f.write(_encode(record))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    print(f"Migrated {len(records)} records from {legacy_path} to {path}")
+    return len(records)
+
+def migrate_legacy(path=DB_PATH, legacy_path=LEGACY_DB_PATH):
+    """One-time migration, run lazily before the first read or write."""
+    global _migrated
+    if _migrated and path == DB_PATH: return 0
+    with file_lock(path):
+        count = _migrate_legacy_locked(path, legacy_path)
+    if path == DB_PATH: _migrated = True
+    return count
+
+def append(record, path=DB_PATH):
+    """Appends one record as a single write + fsync under the DB lock."""
+    append_many([record], path)
+
+def append_many(records, path=DB_PATH):
+    """Appends several records with ONE locked write + fsync."""
+    if not records: return
+    data = b"".join(_encode(record) for record in records)
+    migrate_legacy(path)
+    with file_lock(path):
+        with open(path, "a+b") as f:
+            # A crash mid-append leaves a line without "\n": terminate it so ours stays intact
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n": data = b"\n" + data
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+def iter_records(path=DB_PATH):
+    """Streams records in insertion order. Torn lines (crash mid-append) are skipped."""
+    migrate_legacy(path)
+    if not os.path.exists(path): return
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def read_all(path=DB_PATH):
+    return list(iter_records(path))
@@ -0,0 +1,182 @@
+import os
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prometheus text-format exporter. 0 disables it; a port already in use (second app process) is skipped.
+# Loopback only by default (the endpoint has no auth); SREV_METRICS_HOST=0.0.0.0 opts in to remote scraping.
+EXPORTER_PORT = int(os.getenv('SREV_METRICS_PORT', '9464'))
+EXPORTER_HOST = os.getenv('SREV_METRICS_HOST', '127.0.0.1')
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in (*zip(names, values), *extra)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _format_number(value):
+    if value == float('inf'): return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonic count per label combination: audits.inc(outcome='complete')."""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(labels.get(name, '') for name in self.labels)
+
+    def inc(self, value=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_number(value)}" for key, value in items]
+
+class Histogram(Counter):
+    """Cumulative buckets plus _sum/_count per label combination; .time(**labels) observes a with-block."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            state['counts'][bisect.bisect_left(self.buckets, value)] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def value(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return (state['count'], state['sum']) if state else (0, 0.0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, {**state, 'counts': list(state['counts'])}) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            running = 0
+            for bound, count in zip((*self.buckets, float('inf')), state['counts']):
+                running += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, [('le', _format_number(bound))])} {running}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_number(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {state['count']}")
+        return lines
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics: raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+# --- Audit pipeline ---
+AUDITS_STARTED = REGISTRY.counter('srev_audits_started_total', "Audits started.")
+AUDITS_COMPLETED = REGISTRY.counter('srev_audits_completed_total', "Audits finished, by outcome (complete, partial = some source timed out).", ['outcome'])
+AUDIT_DURATION = REGISTRY.histogram('srev_audit_duration_seconds', "Wall time of perform_audit_async.")
+FETCH_DURATION = REGISTRY.histogram('srev_fetch_duration_seconds', "Page fetch latency per source, deadline waits included.", ['source', 'outcome'])
+SOURCE_RESULTS = REGISTRY.counter('srev_source_results_total', "Instagram/Facebook/GMB analysis results (success, soft_fail, unreachable, timed_out, missing).", ['source', 'result'])
+RESULT_CACHE = REGISTRY.counter('srev_result_cache_lookups_total', "Per-source result cache lookups.", ['source', 'result'])
+HTTP_RESPONSES = REGISTRY.counter('srev_http_responses_total', "Page responses by status (revalidated = served from the HTTP cache after a 304).", ['status', 'revalidated'])
+# --- Persistence ---
+DB_WRITE_DURATION = REGISTRY.histogram('srev_db_write_duration_seconds', "Patient record write latency (one batch).", ['backend', 'outcome'])
+DB_RECORDS = REGISTRY.counter('srev_db_records_written_total', "Patient records written.", ['backend'])
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+def start_exporter(port=EXPORTER_PORT, host=EXPORTER_HOST):
+    """Serves /metrics on a daemon thread. Idempotent per process (safe on every Streamlit rerun)."""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is not None or not port: return _exporter or None
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            print(f"Metrics exporter not started on port {port}: {e}")
+            _exporter = False # Don't retry on every rerun
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name='metrics-exporter', daemon=True).start()
+        _exporter = server
+        print(f"Metrics exporter on http://{host}:{server.server_port}/metrics")
+        return server
@@ -0,0 +1,67 @@
+import os
+from utils import html_features
+
+# Download policy for scraped pages
+MAX_PAGE_BYTES = int(os.getenv('SREV_MAX_PAGE_BYTES', str(2 * 1024 * 1024)))
+CHUNK_SIZE = 16384
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+UNSUPPORTED_MEDIA_TYPE = 415   # status reported when a URL serves something other than HTML
+
+# Signals each source actually needs; reading stops as soon as they are all seen.
+# The website needs the whole page (tag counts), so it only stops at the byte cap.
+REQUIRED_SIGNALS = {
+    'website': (),
+    'social': ('head_complete',),     # title + meta descriptions live in <head>
+    'gmb': ('title', 'rating'),
+}
+
+def is_html(content_type):
+    """Missing Content-Type is given the benefit of the doubt."""
+    if not content_type: return True
+    return content_type.split(';')[0].strip().lower() in HTML_CONTENT_TYPES
+
+def charset(content_type):
+    """The charset= parameter of a Content-Type header, or None."""
+    for param in (content_type or '').split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset': return value.strip().strip('"\'') or None
+    return None
+
+class PageReader:
+    """
+    Consumes a streamed body chunk by chunk, feeding the single-pass extractor as bytes arrive.
+    add() returns False when the caller should stop reading: byte cap hit (truncated) or every
+    required signal found (stopped_early). `encoding` is the response's header charset.
+    """
+
+    def __init__(self, max_bytes=MAX_PAGE_BYTES, required=(), encoding=None):
+        self.max_bytes = max_bytes
+        self.required = required
+        self.extractor = html_features.FeatureExtractor(encoding)
+        self._chunks = []
+        self.bytes_read = 0
+        self.truncated = False
+        self.stopped_early = False
+
+    @property
+    def complete(self):
+        return not (self.truncated or self.stopped_early)
+
+    def add(self, chunk):
+        room = self.max_bytes - self.bytes_read
+        if len(chunk) > room:
+            chunk = chunk[:room]
+            self.truncated = True
+        if chunk:
+            self._chunks.append(chunk)
+            self.bytes_read += len(chunk)
+            self.extractor.feed_bytes(chunk)
+        if self.truncated: return False
+        if self.required and self.extractor.found(self.required):
+            self.stopped_early = True
+            return False
+        return True
+
+    def finish(self):
+        """Returns (body_bytes, features)."""
+        return b''.join(self._chunks), self.extractor.finish()
@@ -4,30 +4,94 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from io import BytesIO
+import copy
 import datetime
+from utils import tracing
+
+# --- Report template: built once at import, shared by every report ---
+
+def _build_styles():
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='MedicalTitle', parent=styles['Heading1'], fontName='Helvetica-Bold', fontSize=24, textColor=colors.HexColor('#004A99'), spaceAfter=20))
+    styles.add(ParagraphStyle(name='MedicalSubHeader', parent=styles['Heading2'], fontName='Helvetica-Bold', fontSize=18, textColor=colors.HexColor('#2D3748'), spaceAfter=12))
+    styles.add(ParagraphStyle(name='NormalMedical', parent=styles['Normal'], fontName='Helvetica', fontSize=12, leading=16))
+    styles.add(ParagraphStyle(name='CriticalSymptom', parent=styles['Normal'], fontName='Helvetica-Oblique', fontSize=11, textColor=colors.red))
+    styles.add(ParagraphStyle(name='ScoreHighlight', parent=styles['Normal'], fontName='Helvetica-Bold', fontSize=14, textColor=colors.HexColor('#004A99')))
+    return styles
+
+STYLES = _build_styles()
+
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#004A99')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E2E8F0')),
+])
+
+CTA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#004A99')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTSIZE', (0, 0), (-1, -1), 16),
+    ('TOPPADDING', (0, 0), (-1, -1), 20),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 20),
+])
+
+DISCLAIMER_TEXT = """<b>DISCLAIMER & CLINICAL NOTE:</b> This Digital Health Biopsy is an indicative diagnostic report based on current algorithmic signals and publicly available data at the time of the scan. While these findings highlight critical "Digital Leaks" and growth gaps, they do not constitute a complete performance strategy. Digital health is dynamic; for a Full Prescription & Implementation Plan tailored to your clinic's specific revenue goals, a specialist consultation is required. Don't leave your growth to chance. Consult the Digital Doctors now. 📞 Call/WhatsApp: +91-8860800507"""
+
+# Static flowables (markup parsed once). Layout state lives on the flowable, so each
+# report takes shallow copies via _static() and concurrent builds never share one.
+REPORT_TITLE = [Paragraph("SREV DIGITAL HEALTH BIOPSY", STYLES['MedicalTitle']), Spacer(1, 20)]
+SUMMARY_INTRO = [
+    Paragraph("Executive Life Support Summary:", STYLES['MedicalSubHeader']),
+    Paragraph("This automated biopsy has scanned your digital infrastructure. Below is a high-level summary of failing organs:", STYLES['NormalMedical']),
+    Spacer(1, 10)
+]
+TRUST_PAGE_INTRO = [
+    Paragraph("Trust & Conversion Metrics", STYLES['MedicalTitle']),
+    Paragraph("Detailed analysis of reputation and lead capture efficiency.", STYLES['NormalMedical']),
+    Spacer(1, 20),
+    Paragraph("Conversion Circulation:", STYLES['MedicalSubHeader'])
+]
+META_HEADING = [Paragraph("Meta Profile Check:", STYLES['MedicalSubHeader'])]
+OBSERVED_METRICS_HEADING = [Paragraph("Observed Metrics:", STYLES['MedicalSubHeader'])]
+SOCIAL_WARNING = [Paragraph("<b>⚠️ Profile not optimized to Meta Algorithms - Consult immediately for Content Analysis.</b>", STYLES['CriticalSymptom']), Spacer(1, 10)]
+SYMPTOMS_HEADING = [Paragraph("Diagnosed Symptoms:", STYLES['MedicalSubHeader'])]
+NO_SYMPTOMS = [Paragraph("No critical symptoms detected.", STYLES['NormalMedical'])]
+PRESCRIPTION_PAGE = [
+    Paragraph("The Prescription", STYLES['MedicalTitle']),
+    Paragraph("<b>CONFIDENTIAL: TREATMENT PLAN LOCKED</b>", STYLES['MedicalSubHeader']),
+    Spacer(1, 20),
+    Paragraph("To access the complete recovery roadmap including code fixes, content calendars, and reputation management scripts, you must unlock the full report.", STYLES['NormalMedical']),
+    Spacer(1, 40),
+    # Simulated Large CTA Button
+    Table([["CALL +91-8860800507 TO UNLOCK"]], colWidths=[400], style=CTA_TABLE_STYLE),
+    Spacer(1, 40),
+    Paragraph(DISCLAIMER_TEXT, STYLES['NormalMedical'])
+]
+
+def _static(flowables):
+    return [copy.copy(flowable) for flowable in flowables]
 
 class BiopsyReportGenerator:
+    """Builds one report: only the per-audit flowables are created here, the rest comes from the template above."""
+
     def __init__(self, audit_data):
         self.data = audit_data
         self.filename = f"SREV_Biopsy_{audit_data['hospital_info']['name'].replace(' ', '_')}.pdf"
-        self.styles = getSampleStyleSheet()
-        self._setup_custom_styles()
-
-    def _setup_custom_styles(self):
-        self.styles.add(ParagraphStyle(name='MedicalTitle', parent=self.styles['Heading1'], fontName='Helvetica-Bold', fontSize=24, textColor=colors.HexColor('#004A99'), spaceAfter=20))
-        self.styles.add(ParagraphStyle(name='MedicalSubHeader', parent=self.styles['Heading2'], fontName='Helvetica-Bold', fontSize=18, textColor=colors.HexColor('#2D3748'), spaceAfter=12))
-        self.styles.add(ParagraphStyle(name='NormalMedical', parent=self.styles['Normal'], fontName='Helvetica', fontSize=12, leading=16))
-        self.styles.add(ParagraphStyle(name='CriticalSymptom', parent=self.styles['Normal'], fontName='Helvetica-Oblique', fontSize=11, textColor=colors.red))
-        self.styles.add(ParagraphStyle(name='ScoreHighlight', parent=self.styles['Normal'], fontName='Helvetica-Bold', fontSize=14, textColor=colors.HexColor('#004A99')))
+        self.styles = STYLES
 
+    @tracing.traced('report.pdf')
     def generate(self):
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=40, leftMargin=40, topMargin=40, bottomMargin=40)
         story = []
 
         # --- Page 1: Executive Summary ---
-        story.append(Paragraph("SREV DIGITAL HEALTH BIOPSY", self.styles['MedicalTitle']))
-        story.append(Spacer(1, 20))
+        story.extend(_static(REPORT_TITLE))
         
         info = self.data['hospital_info']
         story.append(Paragraph(f"<b>Patient (Practice):</b> {info['name']}", self.styles['NormalMedical']))
@@ -42,9 +106,7 @@ class BiopsyReportGenerator:
         story.append(Paragraph(f"Condition Status: <b>{condition}</b>", self.styles['NormalMedical']))
         story.append(Spacer(1, 20))
         
-        story.append(Paragraph("Executive Life Support Summary:", self.styles['MedicalSubHeader']))
-        story.append(Paragraph("This automated biopsy has scanned your digital infrastructure. Below is a high-level summary of failing organs:", self.styles['NormalMedical']))
-        story.append(Spacer(1, 10))
+        story.extend(_static(SUMMARY_INTRO))
         
         biopsy = self.data['digital_biopsy']
         summary_data = [
@@ -55,17 +117,7 @@ class BiopsyReportGenerator:
             ["Meta Profile", f"{biopsy['meta_profile']['score']}/100", "Review"]
         ]
         
-        t = Table(summary_data, colWidths=[200, 100, 100])
-        t.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#004A99')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F8F9FA')),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#E2E8F0')),
-        ]))
-        story.append(t)
+        story.append(Table(summary_data, colWidths=[200, 100, 100], style=SUMMARY_TABLE_STYLE))
         story.append(PageBreak())
 
         # --- Page 2: Website Biopsy ---
@@ -78,42 +130,19 @@ class BiopsyReportGenerator:
         # Note: In our Logic, GMB is inside Public Pulse. We can extract it for clarity if consistent.
         # Or just simulate a separate page from the Combined pulse data if we want.
         # Let's write a generic page 4 with Conversion + Trust details logic.
-        story.append(Paragraph("Trust & Conversion Metrics", self.styles['MedicalTitle']))
-        story.append(Paragraph("Detailed analysis of reputation and lead capture efficiency.", self.styles['NormalMedical']))
-        story.append(Spacer(1, 20))
-        
-        story.append(Paragraph("Conversion Circulation:", self.styles['MedicalSubHeader']))
+        story.extend(_static(TRUST_PAGE_INTRO))
         for s in biopsy['conversion_circulation']['symptoms']:
              story.append(Paragraph(f"• {s}", self.styles['CriticalSymptom']))
         story.append(Spacer(1, 20))
         
-        story.append(Paragraph("Meta Profile Check:", self.styles['MedicalSubHeader']))
+        story.extend(_static(META_HEADING))
         for k, v in biopsy['meta_profile']['metrics'].items():
             story.append(Paragraph(f"• {k.replace('_', ' ').title()}: {'DETECTED' if v else 'MISSING'}", self.styles['NormalMedical']))
         
         story.append(PageBreak())
 
-        # --- Page 5: The Prescription ---
-        story.append(Paragraph("The Prescription", self.styles['MedicalTitle']))
-        story.append(Paragraph("<b>CONFIDENTIAL: TREATMENT PLAN LOCKED</b>", self.styles['MedicalSubHeader']))
-        story.append(Spacer(1, 20))
-        
-        story.append(Paragraph("To access the complete recovery roadmap including code fixes, content calendars, and reputation management scripts, you must unlock the full report.", self.styles['NormalMedical']))
-        story.append(Spacer(1, 40))
-        
-        # Simulated Large CTA Button
-        story.append(Table([["CALL +91-8860800507 TO UNLOCK"]], colWidths=[400], style=TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#004A99')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTSIZE', (0, 0), (-1, -1), 16),
-            ('TOPPADDING', (0, 0), (-1, -1), 20),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 20),
-        ])))
-        
-        story.append(Spacer(1, 40))
-        disclaimer_text = """<b>DISCLAIMER & CLINICAL NOTE:</b> This Digital Health Biopsy is an indicative diagnostic report based on current algorithmic signals and publicly available data at the time of the scan. While these findings highlight critical "Digital Leaks" and growth gaps, they do not constitute a complete performance strategy. Digital health is dynamic; for a Full Prescription & Implementation Plan tailored to your clinic's specific revenue goals, a specialist consultation is required. Don't leave your growth to chance. Consult the Digital Doctors now. 📞 Call/WhatsApp: +91-8860800507"""
-        story.append(Paragraph(disclaimer_text, self.styles['NormalMedical']))
+        # --- Page 5: The Prescription (fully static) ---
+        story.extend(_static(PRESCRIPTION_PAGE))
         
         doc.build(story)
         buffer.seek(0)
@@ -130,7 +159,7 @@ class BiopsyReportGenerator:
              story.append(Paragraph(f"<b>Source Verified:</b> {src}", self.styles['NormalMedical']))
              story.append(Spacer(1, 10))
         
-        story.append(Paragraph("Observed Metrics:", self.styles['MedicalSubHeader']))
+        story.extend(_static(OBSERVED_METRICS_HEADING))
         for k, v in data['metrics'].items():
             if isinstance(v, bool):
                 val = "Yes" if v else "No"
@@ -141,15 +170,14 @@ class BiopsyReportGenerator:
         story.append(Spacer(1, 15))
         
         if "Social" in title:
-             story.append(Paragraph("<b>⚠️ Profile not optimized to Meta Algorithms - Consult immediately for Content Analysis.</b>", self.styles['CriticalSymptom']))
-             story.append(Spacer(1, 10))
+             story.extend(_static(SOCIAL_WARNING))
 
-        story.append(Paragraph("Diagnosed Symptoms:", self.styles['MedicalSubHeader']))
+        story.extend(_static(SYMPTOMS_HEADING))
         if data['symptoms']:
             for s in data['symptoms']:
                 story.append(Paragraph(f"• {s}", self.styles['CriticalSymptom']))
         else:
-            story.append(Paragraph("No critical symptoms detected.", self.styles['NormalMedical']))
+            story.extend(_static(NO_SYMPTOMS))
             
         story.append(PageBreak())
 
@@ -0,0 +1,136 @@
+import os
+import time
+import queue
+import atexit
+import threading
+from utils import firebase_handler as fb
+from utils import tracing
+
+# Write-behind policy
+MAX_PENDING = int(os.getenv('SREV_WRITE_QUEUE_SIZE', '1000'))    # bounded memory
+BATCH_SIZE = int(os.getenv('SREV_WRITE_BATCH_SIZE', '50'))
+FLUSH_INTERVAL = float(os.getenv('SREV_WRITE_FLUSH_INTERVAL', '1.0'))  # max seconds a record waits for its batch
+MAX_RETRIES = 4
+BACKOFF_SECONDS = 0.5
+
+_log = tracing.get_logger('persistence')
+
+class WriteBehindQueue:
+    """
+    Accepts audit results instantly and persists them from a background thread.
+    Records are grouped into batches (one Firestore batched write / one local append),
+    retried with exponential backoff, and the admin email is sent once a batch is stored.
+    If the queue is full, submit() falls back to a synchronous save (nothing is dropped).
+    """
+
+    def __init__(self, max_pending=MAX_PENDING, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._thread = None
+        self._stopping = False
+        self.stats = {'submitted': 0, 'saved': 0, 'failed': 0, 'batches': 0, 'retries': 0, 'sync_fallbacks': 0}
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = False
+                self._thread = threading.Thread(target=self._run, name='srev-write-behind', daemon=True)
+                self._thread.start()
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def submit(self, record, notify=True):
+        """Stamps the record (created_at / patient_id) and queues it. Returns the stamped record."""
+        fb.stamp_record(record)
+        self._count('submitted')
+        try:
+            self._queue.put_nowait((record, notify))
+        except queue.Full:
+            self._count('sync_fallbacks')
+            self._write_batch([(record, notify)])
+            return record
+        self._ensure_worker()
+        return record
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopping: return
+                continue
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch)
+            except Exception:
+                # Never let one batch kill the worker: later records would sit unwritten
+                _log.exception("Write-behind: batch of %d records failed", len(batch))
+            finally:
+                for _ in batch: self._queue.task_done()
+
+    def _write_batch(self, batch):
+        records = [record for record, _ in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                ok, message = fb.save_patient_files(records)
+            except Exception as e:
+                ok, message = False, str(e)
+            if ok: break
+            if attempt < self.max_retries:
+                self._count('retries')
+                time.sleep(self.backoff * (2 ** attempt))
+        else:
+            self._count('failed', len(records))
+            _log.error("Write-behind: giving up on %d records: %s", len(records), message)
+            return
+        self._count('saved', len(records))
+        self._count('batches')
+        for record, notify in batch:
+            if not notify: continue
+            try:
+                fb.trigger_admin_email(record)
+            except Exception:
+                _log.exception("Write-behind: admin email failed for %s", record.get('patient_id'))
+
+    def pending(self):
+        return self._queue.unfinished_tasks
+
+    def flush(self, timeout=10.0):
+        """Blocks until everything queued so far is persisted (or timeout). Returns True if drained."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline: return False
+            time.sleep(0.02)
+        return True
+
+    def shutdown(self, timeout=10.0):
+        """Flush-on-shutdown hook: drains the queue, then stops the worker."""
+        drained = self.flush(timeout)
+        self._stopping = True
+        if self._thread: self._thread.join(timeout=self.flush_interval * 2)
+        return drained
+
+_queue = WriteBehindQueue()
+atexit.register(_queue.shutdown)
+
+def submit(record, notify=True):
+    return _queue.submit(record, notify)
+
+def flush(timeout=10.0):
+    return _queue.flush(timeout)
+
+def queue_stats():
+    return {**_queue.stats, 'pending': _queue.pending()}
@@ -0,0 +1,181 @@
+import os
+import time
+import random
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from utils import tracing
+
+# Requests/second and burst per site (subdomains included). Override with
+# SREV_RATE_LIMITS="instagram.com=0.5/3,facebook.com=0.5/3"; unlisted hosts get SREV_RATE_DEFAULT each.
+DEFAULT_RULES = {
+    'instagram.com': (0.5, 3),
+    'facebook.com': (0.5, 3),
+    'google.com': (1.0, 5),
+    'goo.gl': (1.0, 5),
+}
+BACKOFF_BASE = float(os.getenv('SREV_RATE_BACKOFF', '2'))    # seconds after the first 429, doubling per repeat
+BACKOFF_MAX = 60.0
+
+_log = tracing.get_logger('rate_limiter')
+
+def parse_rule(value):
+    rate, _, burst = value.partition('/')
+    return float(rate), int(burst or max(1, float(rate)))
+
+def load_rules():
+    rules = dict(DEFAULT_RULES)
+    for item in filter(None, os.getenv('SREV_RATE_LIMITS', '').split(',')):
+        domain, _, value = item.partition('=')
+        rules[domain.strip().lower()] = parse_rule(value.strip())
+    return rules
+
+DEFAULT_LIMIT = parse_rule(os.getenv('SREV_RATE_DEFAULT', '10/20'))
+
+def parse_retry_after(value):
+    """Retry-After as seconds (delta-seconds or HTTP-date), None if absent/invalid."""
+    if not value: return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class TokenBucket:
+    """
+    Classic token bucket on the monotonic clock. reserve() always takes a token, letting the
+    balance go negative, and returns how long the caller must wait for it. Callers are
+    therefore served in reservation order without polling. A caller that gives up before its
+    turn (deadline, cancellation) must refund() the token, or the queue grows without bound.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0   # set by a 429 back-off
+        self.strikes = 0           # consecutive 429s
+
+    def reserve(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+class RateLimiter:
+    """
+    Process-wide per-host scheduler shared by every thread, requests Session and AsyncFetcher.
+    acquire() / acquire_async() block until the host's bucket grants a slot; record_status()
+    feeds responses back so a 429 pauses that host with jittered exponential back-off
+    (Retry-After honoured as a floor).
+    """
+
+    def __init__(self, rules=None, default=DEFAULT_LIMIT):
+        self.rules = load_rules() if rules is None else rules
+        self.default = default
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._stats = {}
+
+    def host_key(self, url):
+        """Rule domain covering this URL's host, else the host itself."""
+        host = (urlsplit(url).hostname or '').lower()
+        for domain in self.rules:
+            if host == domain or host.endswith('.' + domain): return domain
+        return host
+
+    def _bucket(self, key):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*self.rules.get(key, self.default))
+            self._stats[key] = {'requests': 0, 'delayed': 0, 'wait_seconds': 0.0, 'max_wait': 0.0,
+                                'waiting': 0, 'peak_waiting': 0, 'abandoned': 0, 'throttled': 0}
+        return bucket
+
+    def reserve(self, url):
+        """Takes a slot for `url` and returns (key, seconds to wait before sending)."""
+        key = self.host_key(url)
+        with self._lock:
+            wait = self._bucket(key).reserve(time.monotonic())
+            stats = self._stats[key]
+            stats['requests'] += 1
+            if wait > 0:
+                stats['delayed'] += 1
+                stats['wait_seconds'] += wait
+                stats['max_wait'] = max(stats['max_wait'], wait)
+                stats['waiting'] += 1
+                stats['peak_waiting'] = max(stats['peak_waiting'], stats['waiting'])
+        return key, wait
+
+    def _done_waiting(self, key, abandoned=False):
+        with self._lock:
+            self._stats[key]['waiting'] -= 1
+            if abandoned:
+                # Hand the slot back so callers queued later aren't pushed past their deadlines
+                self._buckets[key].refund()
+                self._stats[key]['abandoned'] += 1
+
+    def acquire(self, url):
+        key, wait = self.reserve(url)
+        if wait <= 0: return
+        try:
+            time.sleep(wait)
+        except BaseException:
+            self._done_waiting(key, abandoned=True)
+            raise
+        self._done_waiting(key)
+
+    async def acquire_async(self, url):
+        """Waits for a slot; if cancelled while waiting (asyncio.wait_for deadline), the token is refunded."""
+        key, wait = self.reserve(url)
+        if wait <= 0: return
+        try:
+            await asyncio.sleep(wait)
+        except BaseException:
+            self._done_waiting(key, abandoned=True)
+            raise
+        self._done_waiting(key)
+
+    def record_status(self, url, status, retry_after=None):
+        """429 -> back off this host; any other answer resets its strike count."""
+        key = self.host_key(url)
+        with self._lock:
+            bucket = self._bucket(key)
+            if status != 429:
+                bucket.strikes = 0
+                return
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** bucket.strikes)
+            delay = random.uniform(delay / 2, delay) # Jitter: waiting clients don't return in lockstep
+            floor = parse_retry_after(retry_after)
+            if floor is not None: delay = max(delay, min(floor, BACKOFF_MAX))
+            bucket.strikes += 1
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + delay)
+            self._stats[key]['throttled'] += 1
+        _log.warning("429 from %s: backing off %.1fs", key, delay)
+
+    def stats(self):
+        """Per-host queueing metrics."""
+        with self._lock:
+            return {key: {**stats, 'wait_seconds': round(stats['wait_seconds'], 3), 'max_wait': round(stats['max_wait'], 3)}
+                    for key, stats in self._stats.items()}
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+def get_limiter():
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None: _limiter = RateLimiter()
+        return _limiter
+
+def limiter_stats():
+    return get_limiter().stats()
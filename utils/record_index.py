@@ -0,0 +1,157 @@
+import os
+import json
+import bisect
+import threading
+from utils import local_store
+from utils import tracing
+
+SORT_KEYS = ('created_at', 'name', 'health_score')
+
+_log = tracing.get_logger('record_index')
+
+def _summary(record, offset, length):
+    """Lightweight row kept in memory for each record (the full record stays on disk)."""
+    info = record.get('hospital_info') or {}
+    score = record.get('health_score')
+    return {
+        'offset': offset,
+        'length': length,
+        'patient_id': record.get('patient_id'),
+        'created_at': record.get('created_at') or '',
+        'name': info.get('name') or '',
+        'health_score': score if isinstance(score, (int, float)) else -1
+    }
+
+class RecordIndex:
+    """
+    In-memory indexes over the append-only local DB.
+    refresh() only parses bytes appended since the last call, so keeping the index warm
+    costs O(new records). Sorted (key, seq) lists on created_at, hospital name and
+    health_score make sorting, range filters and page/offset lookups O(log n + page).
+    """
+
+    def __init__(self, path=local_store.DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._read_offset = 0
+        self._rows = []
+        self._by = {key: [] for key in SORT_KEYS}
+        self._by_patient = {}
+        self.duplicate_ids = []   # patient_ids seen more than once (lookups keep the first record)
+
+    def _sort_value(self, row, key):
+        return row['name'].lower() if key == 'name' else row[key]
+
+    def _add(self, row):
+        seq = len(self._rows)
+        self._rows.append(row)
+        for key in SORT_KEYS:
+            entry = (self._sort_value(row, key), seq)
+            sorted_list = self._by[key]
+            # Records mostly arrive in created_at order, so this is usually an O(1) append
+            if not sorted_list or sorted_list[-1] <= entry:
+                sorted_list.append(entry)
+            else:
+                bisect.insort(sorted_list, entry)
+        patient_id = row['patient_id']
+        if patient_id:
+            if patient_id in self._by_patient:
+                # Never re-point an id at a different audit: get_record() and the report cache rely on it
+                self.duplicate_ids.append(patient_id)
+                _log.warning("Duplicate patient_id %s in %s: keeping the first record", patient_id, self.path)
+            else:
+                self._by_patient[patient_id] = seq
+
+    def refresh(self):
+        """Indexes records appended since the last refresh."""
+        local_store.migrate_legacy(self.path)
+        with self._lock:
+            if not os.path.exists(self.path):
+                self._reset()
+                return 0
+            if os.path.getsize(self.path) < self._read_offset:
+                self._reset() # File was replaced/truncated: rebuild
+            added = 0
+            with open(self.path, 'rb') as f:
+                f.seek(self._read_offset)
+                offset = self._read_offset
+                for line in f:
+                    if not line.endswith(b'\n'): break # Append still in progress
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None # Torn line from a crash
+                    if isinstance(record, dict):
+                        self._add(_summary(record, offset, len(line)))
+                        added += 1
+                    offset += len(line)
+                self._read_offset = offset
+            return added
+
+    def count(self):
+        with self._lock:
+            return len(self._rows)
+
+    def query(self, sort_by='created_at', descending=True, offset=0, limit=25,
+              name_prefix=None, min_score=None, max_score=None, date_from=None, date_to=None):
+        """
+        Returns (page_rows, total_matches).
+        Range filters on the sort key are resolved by bisection; other filters are applied
+        while walking the sorted index.
+        """
+        if sort_by not in SORT_KEYS: raise ValueError(f"sort_by must be one of {SORT_KEYS}")
+        self.refresh()
+        ranges = {
+            'created_at': (date_from, date_to + '\uffff' if date_to else None),
+            'name': (name_prefix.lower(), name_prefix.lower() + '\uffff') if name_prefix else (None, None),
+            'health_score': (min_score, max_score)
+        }
+        with self._lock:
+            entries = self._by[sort_by]
+            low, high = ranges[sort_by]
+            start = bisect.bisect_left(entries, (low,)) if low is not None else 0
+            end = bisect.bisect_right(entries, (high, float('inf'))) if high is not None else len(entries)
+            seqs = range(end - 1, start - 1, -1) if descending else range(start, end)
+
+            others = [(k, lo, hi) for k, (lo, hi) in ranges.items() if k != sort_by and (lo is not None or hi is not None)]
+            if not others:
+                total = len(seqs)
+                page = [self._rows[entries[i][1]] for i in seqs[offset:offset + limit]]
+            else:
+                matches = [self._rows[entries[i][1]] for i in seqs if self._match(self._rows[entries[i][1]], others)]
+                total = len(matches)
+                page = matches[offset:offset + limit]
+            return [dict(row) for row in page], total
+
+    def _match(self, row, filters):
+        for key, lo, hi in filters:
+            value = self._sort_value(row, key)
+            if lo is not None and value < lo: return False
+            if hi is not None and value > hi: return False
+        return True
+
+    def get_record(self, patient_id=None, row=None):
+        """Loads ONE full record from disk, by patient_id or by a summary row from query()."""
+        if row is None:
+            self.refresh()
+            with self._lock:
+                seq = self._by_patient.get(patient_id)
+                if seq is None: return None
+                row = self._rows[seq]
+        with open(self.path, 'rb') as f:
+            f.seek(row['offset'])
+            return json.loads(f.read(row['length']))
+
+# One warm index per process (shared across Streamlit sessions)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index(path=local_store.DB_PATH):
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = RecordIndex(path)
+        return index
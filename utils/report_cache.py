@@ -0,0 +1,81 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from utils import pdf_generator
+
+MAX_BYTES = int(float(os.getenv('SREV_REPORT_CACHE_MB', '16')) * 1024 * 1024)
+
+# Download payloads of one audit, both as bytes
+ReportArtifacts = namedtuple('ReportArtifacts', ['pdf', 'json'])
+
+def content_hash(record):
+    """Stable digest of the audit data, so an edited or re-run audit never gets a stale PDF."""
+    canonical = json.dumps(record, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+def build_artifacts(record):
+    pdf = pdf_generator.generate_pdf_report(record).getvalue()
+    return ReportArtifacts(pdf, json.dumps(record, indent=4).encode('utf-8'))
+
+class ReportCache:
+    """
+    LRU of rendered report downloads keyed by (patient_id, content hash), bounded by total bytes.
+    The PDF and JSON export are built once per audit; Streamlit reruns of the results view
+    (any button click) are then served from memory.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> ReportArtifacts
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def key(self, record):
+        return record.get('patient_id', ''), content_hash(record)
+
+    def get(self, record):
+        """Returns the ReportArtifacts for this audit, rendering them on the first call."""
+        key = self.key(record)
+        with self._lock:
+            artifacts = self._entries.get(key)
+            if artifacts is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return artifacts
+            self.stats['misses'] += 1
+        # Rendered outside the lock: other sessions' downloads aren't held up by ReportLab
+        artifacts = build_artifacts(record)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = artifacts
+                self._bytes += len(artifacts.pdf) + len(artifacts.json)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= len(old.pdf) + len(old.json)
+                self.stats['evictions'] += 1
+        return artifacts
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'bytes': self._bytes}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Process-wide report cache (shared by all Streamlit sessions)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None: _cache = ReportCache()
+        return _cache
+
+def get_artifacts(record):
+    return get_cache().get(record)
@@ -0,0 +1,125 @@
+import os
+import json
+import copy
+import time
+import shelve
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit
+
+# How long each source's analysis stays fresh (seconds)
+DEFAULT_TTLS = {
+    'website': int(os.getenv('SREV_CACHE_TTL_WEBSITE', '3600')),
+    'social': int(os.getenv('SREV_CACHE_TTL_SOCIAL', '21600')),
+    'gmb': int(os.getenv('SREV_CACHE_TTL_GMB', '43200')),
+}
+MAX_BYTES = int(float(os.getenv('SREV_RESULT_CACHE_MB', '32')) * 1024 * 1024)
+PERSIST_PATH = os.getenv('SREV_RESULT_CACHE_PATH')  # e.g. "srev_cache/results" to survive restarts
+
+def normalize_url(url):
+    """Canonical form so 'Example.com/', 'https://example.com' and 'https://EXAMPLE.com#x' share a key."""
+    url = (url or '').strip()
+    if not url: return ''
+    if not url.startswith('http'): url = 'https://' + url
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/')
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ''))
+
+def audit_keys(website_url, gmb_link, fb_link, insta_link):
+    """Per-source cache keys derived from the normalized (url, gmb, fb, insta) tuple."""
+    insta = (insta_link or '').strip()
+    if insta and not insta.startswith('http'): insta = 'https://www.instagram.com/' + insta.replace('@', '')
+    return {
+        'website': normalize_url(website_url),
+        'social': normalize_url(insta) + '|' + normalize_url(fb_link),
+        'gmb': normalize_url(gmb_link),
+    }
+
+class ResultCache:
+    """
+    TTL + LRU cache of analysis results, bounded by an approximate memory cap (JSON size).
+    Entries are keyed by (source, key) and expire after that source's TTL.
+    With persist_path, entries are mirrored to a shelve file and reloaded at startup.
+    """
+
+    def __init__(self, ttls=None, max_bytes=MAX_BYTES, persist_path=PERSIST_PATH):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # (source, key) -> (stored_at, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._shelf = None
+        if persist_path:
+            os.makedirs(os.path.dirname(persist_path) or '.', exist_ok=True)
+            self._shelf = shelve.open(persist_path)
+            self._load()
+
+    def _load(self):
+        now = time.time()
+        for shelf_key in list(self._shelf.keys()):
+            source, key = shelf_key.split('\x1f', 1)
+            stored_at, value = self._shelf[shelf_key]
+            if now - stored_at < self.ttls.get(source, 0):
+                self._insert((source, key), stored_at, value)
+            else:
+                del self._shelf[shelf_key]
+
+    def _insert(self, entry_key, stored_at, value):
+        size = len(json.dumps(value, default=str))
+        if entry_key in self._entries:
+            self._bytes -= self._entries.pop(entry_key)[2]
+        self._entries[entry_key] = (stored_at, value, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, (_, _, old_size) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.stats['evictions'] += 1
+            if self._shelf is not None: self._shelf.pop('\x1f'.join(old_key), None)
+
+    def get(self, source, key):
+        """Returns (value, age_seconds) for a fresh entry, else None."""
+        with self._lock:
+            entry = self._entries.get((source, key))
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            age = time.time() - entry[0]
+            if age >= self.ttls.get(source, 0):
+                self._bytes -= entry[2]
+                del self._entries[(source, key)]
+                if self._shelf is not None: self._shelf.pop(source + '\x1f' + key, None)
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end((source, key))
+            self.stats['hits'] += 1
+            return copy.deepcopy(entry[1]), age
+
+    def put(self, source, key, value):
+        with self._lock:
+            stored_at = time.time()
+            value = copy.deepcopy(value)
+            self._insert((source, key), stored_at, value)
+            if self._shelf is not None:
+                self._shelf[source + '\x1f' + key] = (stored_at, value)
+                self._shelf.sync()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._shelf is not None: self._shelf.clear()
+
+    def info(self):
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries), 'bytes': self._bytes}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Process-wide result cache (shared by all Streamlit sessions)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None: _cache = ResultCache()
+        return _cache
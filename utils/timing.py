@@ -0,0 +1,92 @@
+import os
+import time
+import socket
+import threading
+import concurrent.futures
+
+# Phases of one HTTP request, in order. All on the monotonic clock, in seconds.
+PHASES = ('dns', 'connect', 'tls', 'ttfb', 'transfer')
+
+# Neither transport exposes its own lookup, so DNS is timed by a separate getaddrinfo. It runs on a
+# side thread (never delaying the request) and at most once per host per DNS_PROBE_TTL seconds.
+DNS_PROBE_TTL = float(os.getenv('SREV_DNS_PROBE_TTL', '300'))
+_dns_times = {}   # (host, port) -> (measured_at, seconds)
+_dns_pending = set()
+_dns_lock = threading.Lock()
+_dns_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix='dns-probe')
+
+def _measure_dns(host, port):
+    began = time.monotonic()
+    try:
+        socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        seconds = time.monotonic() - began
+    except OSError:
+        seconds = None # The request itself will report the failure
+    with _dns_lock:
+        _dns_pending.discard((host, port))
+        if seconds is not None: _dns_times[(host, port)] = (time.monotonic(), seconds)
+    return seconds
+
+class RequestTiming:
+    """
+    Phase breakdown of ONE request attempt (retries and back-off sleeps are not included).
+      dns      - getaddrinfo time for the host, measured off the request path and reused for
+                 DNS_PROBE_TTL (async: only reported when a new connection is opened)
+      connect  - TCP connect, including the transport's own lookup
+      tls      - TLS handshake
+      ttfb     - request sent -> response headers received: the server's real response time
+      transfer - response headers -> last body byte read
+    A phase stays None when it did not happen (reused keep-alive connection, plain http)
+    or cannot be observed by the transport.
+    """
+
+    def __init__(self):
+        self.phases = dict.fromkeys(PHASES)
+        self._started = {}
+
+    def start(self, phase):
+        self._started[phase] = time.monotonic()
+
+    def stop(self, phase):
+        began = self._started.pop(phase, None)
+        if began is not None: self.phases[phase] = time.monotonic() - began
+
+    def probe_dns(self, host, port):
+        """
+        Non-blocking: uses the host's recent lookup time, else starts one on the probe thread and
+        fills the phase in when it finishes (usually before the response is read).
+        """
+        key = (host, port)
+        with _dns_lock:
+            known = _dns_times.get(key)
+            if known and time.monotonic() - known[0] < DNS_PROBE_TTL:
+                self.phases['dns'] = known[1]
+                return
+            if key in _dns_pending: return
+            _dns_pending.add(key)
+        future = _dns_pool.submit(_measure_dns, host, port)
+        future.add_done_callback(self._set_dns)
+
+    def _set_dns(self, future):
+        seconds = future.result()
+        if seconds is not None: self.phases['dns'] = seconds
+
+    async def trace(self, event, info):
+        """httpx `trace` request extension: maps httpcore events onto phases."""
+        if event == 'connection.connect_tcp.started':
+            self.probe_dns(info.get('host'), info.get('port'))
+            self.start('connect')
+        elif event == 'connection.connect_tcp.complete':
+            self.stop('connect')
+        elif event == 'connection.start_tls.started':
+            self.start('tls')
+        elif event == 'connection.start_tls.complete':
+            self.stop('tls')
+        elif event.endswith('.send_request_headers.started'):
+            self.start('ttfb')
+        elif event.endswith('.receive_response_headers.complete'):
+            self.stop('ttfb')
+            self.start('transfer')
+
+    def as_dict(self):
+        return dict(self.phases)
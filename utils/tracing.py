@@ -0,0 +1,150 @@
+import os
+import sys
+import json
+import time
+import atexit
+import random
+import logging
+import functools
+import threading
+import contextvars
+import inspect
+
+# Off by default. SREV_TRACING=log -> one JSON line per span (stderr, or SREV_TRACE_FILE);
+# SREV_TRACING=otel -> OpenTelemetry spans (configure the SDK/exporter as usual), log if not installed.
+MODE = os.getenv('SREV_TRACING', 'off').lower()
+ENABLED = MODE in ('log', 'otel')
+# Diagnostics (retries, back-offs, dropped writes) go to the 'srev.*' loggers, stderr by default.
+LOG_LEVEL = os.getenv('SREV_LOG_LEVEL', 'INFO').upper()
+
+_logger = logging.getLogger('srev.tracing')
+_current = contextvars.ContextVar('srev_span', default=None)
+_counters = {}
+_counters_lock = threading.Lock()
+_otel_tracer = None
+_log_lock = threading.Lock()
+
+def _setup():
+    global MODE, _otel_tracer
+    if MODE == 'otel':
+        try:
+            from opentelemetry import trace
+            _otel_tracer = trace.get_tracer('srev')
+        except ImportError:
+            print("SREV_TRACING=otel but opentelemetry is not installed, logging spans instead.")
+            MODE = 'log'
+    if not _logger.handlers:
+        path = os.getenv('SREV_TRACE_FILE')
+        handler = logging.FileHandler(path, encoding='utf-8') if path else logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        _logger.addHandler(handler)
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+    atexit.register(flush_counters)
+
+def get_logger(name):
+    """
+    Logger 'srev.<name>'. The 'srev' parent gets a stderr handler at SREV_LOG_LEVEL on first use,
+    unless the host app already attached one.
+    """
+    parent = logging.getLogger('srev')
+    with _log_lock:
+        if not parent.handlers:
+            handler = logging.StreamHandler(sys.stderr)
+            handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+            parent.addHandler(handler)
+            parent.setLevel(LOG_LEVEL)
+            parent.propagate = False
+    return logging.getLogger(f'srev.{name}')
+
+class Span:
+    """One timed operation. Children started inside it (same thread or asyncio task) link to it."""
+    __slots__ = ('name', 'attrs', 'trace_id', 'span_id', 'parent_id', 'start', '_t0', '_token', '_otel_cm', '_otel')
+
+    def __init__(self, name, attrs):
+        self.name = name
+        self.attrs = attrs
+        parent = _current.get()
+        self.trace_id = parent.trace_id if parent else f"{random.getrandbits(128):032x}"
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self._otel_cm = self._otel = None
+
+    def set(self, key, value):
+        self.attrs[key] = value
+
+    def __enter__(self):
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self._token = _current.set(self)
+        if _otel_tracer is not None:
+            self._otel_cm = _otel_tracer.start_as_current_span(self.name)
+            self._otel = self._otel_cm.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self._t0) * 1000
+        _current.reset(self._token)
+        if self._otel is not None:
+            for key, value in self.attrs.items():
+                self._otel.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+            self._otel_cm.__exit__(exc_type, exc, tb)
+            return False
+        record = {'span': self.name, 'trace_id': self.trace_id, 'span_id': self.span_id, 'parent_id': self.parent_id,
+                  'start': round(self.start, 6), 'duration_ms': round(duration_ms, 3), 'status': 'error' if exc_type else 'ok'}
+        if exc_type: record['error'] = f"{exc_type.__name__}: {exc}"
+        record.update(self.attrs)
+        _logger.info(json.dumps(record, default=str))
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+    def set(self, key, value): pass
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NOOP = _NoopSpan()
+
+def span(name, **attrs):
+    """`with tracing.span('name', key=value) as s:` - a shared no-op object when tracing is off."""
+    return Span(name, attrs) if ENABLED else _NOOP
+
+def annotate(**attrs):
+    """Adds attributes to the innermost active span (no-op when tracing is off)."""
+    if not ENABLED: return
+    current = _current.get()
+    if current is not None: current.attrs.update(attrs)
+
+def traced(name=None):
+    """Decorator: runs the function (sync or async) inside a span. Returns it untouched when tracing is off."""
+    def decorate(func):
+        if not ENABLED: return func
+        span_name = name or func.__qualname__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with Span(span_name, {}):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with Span(span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count(name, value=1):
+    if not ENABLED: return
+    with _counters_lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def counters():
+    with _counters_lock:
+        return dict(_counters)
+
+def flush_counters():
+    """Writes the counter totals as one structured log line (at exit in log/otel mode)."""
+    snapshot = counters()
+    if snapshot: _logger.info(json.dumps({'counters': snapshot, 'at': round(time.time(), 3)}))
+
+if ENABLED: _setup()
@@ -0,0 +1,86 @@
+import os
+import random
+import itertools
+import threading
+from utils import tracing
+
+_log = tracing.get_logger('user_agents')
+
+BASE_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Referer': 'https://www.google.com/'
+}
+
+# Offline bundle: always available instantly, no data set to load.
+FALLBACK_USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36 Edg/123.0.2420.81',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Safari/605.1.15',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14.4; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:125.0) Gecko/20100101 Firefox/125.0',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4_1 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4.1 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.6367.82 Mobile Safari/537.36',
+    'Mozilla/5.0 (Linux; Android 13; SM-S918B) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.6312.118 Mobile Safari/537.36',
+    'Mozilla/5.0 (iPad; CPU OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Mobile/15E148 Safari/604.1',
+]
+
+POOL_SIZE = int(os.getenv('SREV_UA_POOL_SIZE', '50'))
+
+def _make_profile(user_agent):
+    return {'User-Agent': user_agent, **BASE_HEADERS}
+
+class UserAgentProvider:
+    """
+    Preloaded, rotating pool of request header profiles.
+    Starts from the offline bundle, then (optionally) widens the pool with fake_useragent
+    ONCE in a background thread. next_headers() is O(1) and never blocks on UA generation.
+    """
+
+    def __init__(self, pool_size=POOL_SIZE, use_fake_useragent=True):
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._set_pool(FALLBACK_USER_AGENTS)
+        self._enrich_started = not use_fake_useragent
+
+    def _set_pool(self, agents):
+        profiles = [_make_profile(a) for a in agents]
+        random.shuffle(profiles)
+        self._size = len(profiles)
+        self._cycle = itertools.cycle(profiles)
+
+    def _enrich(self):
+        try:
+            with tracing.span('ua.enrich', pool_size=self.pool_size):
+                from fake_useragent import UserAgent
+                ua = UserAgent()
+                agents = {ua.random for _ in range(self.pool_size)}
+            agents.update(FALLBACK_USER_AGENTS)
+            with self._lock:
+                self._set_pool(sorted(agents))
+        except Exception as e:
+            _log.warning("fake_useragent unavailable, using bundled User-Agents: %s", e)
+
+    def start_enrichment(self):
+        """Kicks off the one-time fake_useragent load without blocking the caller."""
+        with self._lock:
+            if self._enrich_started: return
+            self._enrich_started = True
+        threading.Thread(target=self._enrich, name='ua-preload', daemon=True).start()
+
+    def next_headers(self):
+        """Next header profile in the rotation (a fresh dict the caller may modify)."""
+        self.start_enrichment()
+        with self._lock:
+            return dict(next(self._cycle))
+
+    def pool_info(self):
+        return {'profiles': self._size, 'enrichment_started': self._enrich_started}
+
+_provider = UserAgentProvider(use_fake_useragent=os.getenv('SREV_UA_SOURCE', 'fake_useragent') != 'offline')
+
+def get_headers():
+    return _provider.next_headers()